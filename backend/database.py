@@ -3,11 +3,14 @@ MongoDB Database configuration for AI Interviewer
 Switched from SQLAlchemy to MongoDB for scalable document storage
 """
 
+import asyncio
 import os
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument
+from pymongo.errors import OperationFailure
 from pydantic import BaseModel, Field
 from dotenv import load_dotenv
 
@@ -18,6 +21,14 @@ load_dotenv()
 MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
 DATABASE_NAME = "ai_interviewer"
 
+# Connection pool settings (the client is shared by every request)
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "30"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_POOL_TIMEOUT_MS = int(os.getenv("MONGO_POOL_TIMEOUT_MS", "5000"))
+MONGO_MAX_IDLE_TIME_MS = int(os.getenv("MONGO_MAX_IDLE_TIME_MS", "300000"))
+# How long to wait for a usable server (driver default 30s, enough to ride out failovers and cold starts)
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+
 # Global database client
 client: Optional[AsyncIOMotorClient] = None
 db = None
@@ -50,7 +61,14 @@ async def connect_to_mongo():
     """Connect to MongoDB"""
     global client, db
     try:
-        client = AsyncIOMotorClient(MONGO_URI)
+        client = AsyncIOMotorClient(
+            MONGO_URI,
+            maxPoolSize=MONGO_MAX_POOL_SIZE,
+            minPoolSize=MONGO_MIN_POOL_SIZE,
+            waitQueueTimeoutMS=MONGO_POOL_TIMEOUT_MS,
+            serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS
+        )
         db = client[DATABASE_NAME]
         
         # Test the connection
@@ -86,8 +104,10 @@ async def create_indexes():
     
     # Interview indexes
     await db.interviews.create_index("session_id", unique=True)
-    await db.interviews.create_index("user_id")
     await db.interviews.create_index("started_at")
+    # History lists (newest first) and completed-only stats; the first also serves user_id lookups
+    await db.interviews.create_index([("user_id", 1), ("started_at", -1)])
+    await db.interviews.create_index([("user_id", 1), ("status", 1), ("started_at", -1)])
     
     # Active session indexes (for persistent sessions)
     await db.active_sessions.create_index("session_id", unique=True)
@@ -216,7 +236,9 @@ async def create_user_db(user_data: dict) -> dict:
             "total_interviews": 0,
             "total_questions": 0,
             "perfect_scores": 0,
-            "average_score": 0
+            "average_score": 0,
+            "score_sum": 0,
+            "score_count": 0
         }
     
     if "achievements" not in user_data:
@@ -282,6 +304,70 @@ async def add_user_achievement(user_id: str, achievement_id: str) -> bool:
     return result.modified_count > 0
 
 
+async def increment_user_xp(
+    user_id: str,
+    increments: Dict[str, int],
+    set_fields: Optional[Dict[str, Any]] = None,
+    max_fields: Optional[Dict[str, int]] = None
+) -> Optional[dict]:
+    """Atomically apply $inc/$set/$max to xp_data fields and return the updated xp_data"""
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+    if increments:
+        update["$inc"] = {f"xp_data.{key}": value for key, value in increments.items()}
+    if set_fields:
+        update["$set"].update({f"xp_data.{key}": value for key, value in set_fields.items()})
+    if max_fields:
+        update["$max"] = {f"xp_data.{key}": value for key, value in max_fields.items()}
+    try:
+        user = await db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            update,
+            projection={"xp_data": 1},
+            return_document=ReturnDocument.AFTER
+        )
+    except OperationFailure:
+        # Legacy users can have xp_data: null, which $inc can't create fields under.
+        # Backfill an empty document (only if it's still not one) and retry once.
+        await db.users.update_one(
+            {"_id": ObjectId(user_id), "xp_data": {"$not": {"$type": "object"}}},
+            {"$set": {"xp_data": {}}}
+        )
+        user = await db.users.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            update,
+            projection={"xp_data": 1},
+            return_document=ReturnDocument.AFTER
+        )
+    return user.get("xp_data") if user else None
+
+
+async def award_achievements(user_id: str, rewards: Dict[str, int]) -> Dict[str, int]:
+    """Add newly unlocked achievements and their XP rewards (achievement_id -> xp).
+    Each achievement is only added, and its XP only granted, if the user doesn't have it yet,
+    so concurrent awards can't record it twice. Returns the rewards that were actually granted."""
+    if not rewards:
+        return {}
+    now = datetime.utcnow()
+    user_oid = ObjectId(user_id)
+    # One conditional write per achievement, sent concurrently so each result says whether it applied
+    results = await asyncio.gather(*(
+        db.users.update_one(
+            {"_id": user_oid, "achievements.achievement_id": {"$ne": achievement_id}},
+            {
+                "$inc": {"xp_data.total_xp": xp_reward},
+                "$set": {"updated_at": now},
+                "$push": {"achievements": {"achievement_id": achievement_id, "unlocked_at": now}}
+            }
+        )
+        for achievement_id, xp_reward in rewards.items()
+    ))
+    return {
+        achievement_id: xp_reward
+        for (achievement_id, xp_reward), result in zip(rewards.items(), results)
+        if result.modified_count
+    }
+
+
 async def update_user_settings(user_id: str, settings: dict) -> Optional[dict]:
     """Update user settings"""
     return await update_user(user_id, {"settings": settings})
@@ -308,9 +394,9 @@ async def create_interview_db(interview_data: dict) -> dict:
     return interview_data
 
 
-async def get_interview_by_session_id(session_id: str) -> Optional[dict]:
-    """Get interview by session ID"""
-    interview = await db.interviews.find_one({"session_id": session_id})
+async def get_interview_by_session_id(session_id: str, projection: Optional[dict] = None) -> Optional[dict]:
+    """Get interview by session ID, optionally limited to the projected fields"""
+    interview = await db.interviews.find_one({"session_id": session_id}, projection)
     return serialize_doc(interview)
 
 
@@ -364,9 +450,40 @@ async def add_transcript_message(session_id: str, message: dict) -> bool:
     return result.modified_count > 0
 
 
-async def get_user_interviews(user_id: str, limit: int = 50, skip: int = 0) -> List[dict]:
-    """Get all interviews for a user"""
-    cursor = db.interviews.find({"user_id": user_id}).sort("started_at", -1).skip(skip).limit(limit)
+async def append_interview_turns(session_id: str, turns: List[dict], update_data: dict) -> bool:
+    """Append a batch of transcript messages and set summary fields in one write.
+    Only applies while the interview is active: once it is saved as completed with the
+    full transcript, a flush that arrives late would duplicate turns, so it is dropped."""
+    update = {"$set": update_data}
+    if turns:
+        update["$push"] = {"transcript": {"$each": turns}}
+    result = await db.interviews.update_one({"session_id": session_id, "status": "active"}, update)
+    return result.modified_count > 0
+
+
+# Only the scalar fields interview list views render; the detail endpoint loads
+# the full document (transcript, summary, video metrics, ...)
+LIST_VIEW_PROJECTION = {
+    field: 1 for field in (
+        "session_id", "topic", "topic_name", "company_style", "company_name", "difficulty",
+        "question_count", "average_score", "scores", "duration_seconds", "started_at", "ended_at"
+    )
+}
+
+
+async def get_user_interviews(
+    user_id: str,
+    limit: int = 50,
+    skip: int = 0,
+    status: Optional[str] = None,
+    projection: Optional[dict] = None
+) -> List[dict]:
+    """Get all interviews for a user, optionally only those with the given status.
+    Pass a projection (e.g. LIST_VIEW_PROJECTION) to skip large fields in list views."""
+    query = {"user_id": user_id}
+    if status:
+        query["status"] = status
+    cursor = db.interviews.find(query, projection).sort("started_at", -1).skip(skip).limit(limit)
     interviews = []
     async for interview in cursor:
         interviews.append(serialize_doc(interview))
@@ -383,27 +500,31 @@ async def delete_interview(interview_id: str, user_id: str) -> bool:
 
 
 async def save_interview_to_user(session_id: str, user_id: str) -> Optional[dict]:
-    """Assign a guest interview to a user account"""
-    result = await db.interviews.update_one(
+    """Assign a guest interview to a user account, returning the updated interview"""
+    interview = await db.interviews.find_one_and_update(
         {"session_id": session_id},
-        {"$set": {"user_id": user_id}}
+        {"$set": {"user_id": user_id}},
+        return_document=ReturnDocument.AFTER
     )
-    if result.modified_count > 0 or result.matched_count > 0:
-        return await get_interview_by_session_id(session_id)
-    return None
+    return serialize_doc(interview)
 
 
 # ============== STATS/ANALYTICS OPERATIONS ==============
 
 async def get_user_stats(user_id: str) -> dict:
     """Get aggregated stats for a user"""
+    # Score totals are reduced per document inside MongoDB, so the
+    # score lists never reach Python
+    scores = {"$ifNull": ["$scores", []]}
     pipeline = [
         {"$match": {"user_id": user_id, "status": "completed"}},
         {"$group": {
             "_id": "$user_id",
             "total_interviews": {"$sum": 1},
             "total_questions": {"$sum": "$question_count"},
-            "all_scores": {"$push": "$scores"},
+            "score_sum": {"$sum": {"$sum": scores}},
+            "score_count": {"$sum": {"$size": scores}},
+            "perfect_scores": {"$sum": {"$size": {"$filter": {"input": scores, "cond": {"$gte": ["$$this", 9]}}}}},
             "topics_practiced": {"$addToSet": "$topic"}
         }}
     ]
@@ -413,20 +534,14 @@ async def get_user_stats(user_id: str) -> dict:
     
     if results:
         result = results[0]
-        # Flatten scores
-        all_scores = []
-        for scores in result.get("all_scores", []):
-            if scores:
-                all_scores.extend(scores)
-        
-        avg_score = sum(all_scores) / len(all_scores) if all_scores else 0
-        perfect_scores = sum(1 for s in all_scores if s >= 9)
+        score_count = result.get("score_count", 0)
+        avg_score = result.get("score_sum", 0) / score_count if score_count else 0
         
         return {
             "total_interviews": result.get("total_interviews", 0),
             "total_questions": result.get("total_questions", 0),
             "average_score": round(avg_score, 1),
-            "perfect_scores": perfect_scores,
+            "perfect_scores": result.get("perfect_scores", 0),
             "topics_practiced": result.get("topics_practiced", [])
         }
     
@@ -439,6 +554,31 @@ async def get_user_stats(user_id: str) -> dict:
     }
 
 
+async def get_platform_stats() -> dict:
+    """Get completed interview count, platform average score and user count"""
+    # One pass over completed interviews; $avg skips missing/null scores
+    pipeline = [
+        {"$match": {"status": "completed"}},
+        {"$group": {
+            "_id": None,
+            "total_interviews": {"$sum": 1},
+            "avg_score": {"$avg": "$average_score"}
+        }}
+    ]
+    cursor = db.interviews.aggregate(pipeline)
+    results = await cursor.to_list(length=1)
+    
+    # Collection metadata count - no scan needed for a public counter
+    total_users = await db.users.estimated_document_count()
+    
+    result = results[0] if results else {}
+    return {
+        "total_interviews": result.get("total_interviews", 0),
+        "avg_score": result.get("avg_score"),
+        "total_users": total_users
+    }
+
+
 async def get_global_stat(key: str) -> Optional[str]:
     """Get a global statistic value"""
     stat = await db.global_stats.find_one({"stat_key": key})
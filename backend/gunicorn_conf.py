@@ -0,0 +1,38 @@
+"""
+Gunicorn configuration for AI Interviewer
+Usage: gunicorn main:app -c gunicorn_conf.py
+"""
+
+import multiprocessing
+import os
+
+from uvicorn.workers import UvicornWorker
+
+
+class InterviewWorker(UvicornWorker):
+    """Uvicorn worker with the same loop/parser and concurrency cap as `python main.py`"""
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "limit_concurrency": int(os.getenv("LIMIT_CONCURRENCY", "256")),
+    }
+
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+worker_class = "gunicorn_conf.InterviewWorker"
+
+# Live interview sessions are only shared between workers through Redis,
+# so without REDIS_URL everything has to run in one process
+if os.getenv("REDIS_URL"):
+    workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+else:
+    workers = 1
+
+# Import the app once before forking; MongoDB, Redis and Groq connections are
+# only opened inside each worker (lifespan / first request), never shared
+preload_app = True
+
+# Long enough for a slow transcription + 70B completion, then recycle
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
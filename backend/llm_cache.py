@@ -0,0 +1,82 @@
+"""
+LLM response cache for AI Interviewer
+Short-circuits repeated chat completions for templated summary/coaching/feedback prompts
+"""
+
+import hashlib
+import json
+from typing import Awaitable, Callable, List, Dict, Optional
+
+from cachetools import TTLCache
+
+# Cache configuration
+LLM_CACHE_TTL_SECONDS = 24 * 60 * 60
+LLM_CACHE_MAX_ENTRIES = 2048
+
+
+class LLMCache:
+    """In-process TTL cache of completion text, keyed by the exact request"""
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, ttl: int = LLM_CACHE_TTL_SECONDS):
+        self._entries = TTLCache(maxsize=max_entries, ttl=ttl)
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def cache_key(
+        model: str, messages: List[Dict], temperature: float, max_tokens: int, json_mode: bool = False
+    ) -> str:
+        """Hash the request parameters that determine the completion"""
+        payload = json.dumps(
+            {
+                "model": model, "messages": messages, "temperature": temperature,
+                "max_tokens": max_tokens, "json_mode": json_mode
+            },
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(
+        self, model: str, messages: List[Dict], temperature: float, max_tokens: int, json_mode: bool = False
+    ) -> Optional[str]:
+        """Return the cached completion text for a request, if any"""
+        cached = self._entries.get(self.cache_key(model, messages, temperature, max_tokens, json_mode))
+        if cached is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        return cached
+
+    def set(
+        self, model: str, messages: List[Dict], temperature: float, max_tokens: int, content: str,
+        json_mode: bool = False
+    ):
+        """Cache completion text produced outside get_or_compute (e.g. streamed)"""
+        if content:
+            self._entries[self.cache_key(model, messages, temperature, max_tokens, json_mode)] = content
+
+    async def get_or_compute(
+        self,
+        model: str,
+        messages: List[Dict],
+        temperature: float,
+        max_tokens: int,
+        compute: Callable[[], Awaitable[str]],
+        json_mode: bool = False
+    ) -> str:
+        """Return the cached completion text, or await compute() and cache its result"""
+        cached = self.get(model, messages, temperature, max_tokens, json_mode)
+        if cached is not None:
+            return cached
+
+        content = await compute()
+        self.set(model, messages, temperature, max_tokens, content, json_mode)
+        return content
+
+    def clear(self):
+        """Drop all cached completions"""
+        self._entries.clear()
+
+
+# Shared cache instance
+llm_cache = LLMCache()
@@ -5,22 +5,37 @@ MongoDB-powered backend with guest/authenticated user support
 
 import os
 import uuid
-import io
+import zlib
 import re
+import json
 import time
 import asyncio
-from datetime import datetime
-from typing import Optional, List
-from contextlib import asynccontextmanager
-
-from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Depends, Request, status
+import hashlib
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
+from datetime import datetime, timezone
+from typing import Optional, List, Tuple, TypedDict, Union
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack, asynccontextmanager
+from dataclasses import dataclass
+
+import orjson
+from anyio import to_thread
+
+from fastapi import FastAPI, UploadFile, File, HTTPException, Form, Depends, Request, BackgroundTasks, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import StreamingResponse, JSONResponse
+from fastapi.responses import Response, StreamingResponse, JSONResponse, ORJSONResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.background import BackgroundTask
+from starlette.datastructures import Headers, MutableHeaders
 from pydantic import BaseModel
-from groq import Groq
+import httpx
+from groq import AsyncGroq
 from dotenv import load_dotenv
-import shutil
+from cachetools import TTLCache
 from slowapi import Limiter, _rate_limit_exceeded_handler
 from slowapi.util import get_remote_address
 from slowapi.errors import RateLimitExceeded
@@ -29,10 +44,14 @@ from slowapi.errors import RateLimitExceeded
 from database import (
     init_db, close_mongo_connection, get_database,
     create_user_db, get_user_by_email, get_user_by_username, get_user_by_id,
-    update_user, update_user_xp, add_user_achievement, update_user_settings,
-    create_interview_db, get_interview_by_session_id, update_interview,
+    update_user, update_user_settings,
+    increment_user_xp, award_achievements,
+    create_interview_db, get_interview_by_id, get_interview_by_session_id, update_interview,
     get_user_interviews as db_get_user_interviews, delete_interview as db_delete_interview,
+    LIST_VIEW_PROJECTION,
     save_interview_to_user, get_user_stats as db_get_user_stats, add_transcript_message,
+    get_platform_stats,
+    append_interview_turns,
     # Session persistence functions (replaces in-memory dict)
     create_active_session, get_active_session, update_active_session, 
     delete_active_session, append_to_session_history, append_to_session_scores
@@ -44,24 +63,72 @@ from auth import (
     get_current_user, get_current_user_required, get_password_hash, verify_password,
     user_to_response
 )
+from llm_cache import llm_cache
+from session_store import session_store, REDIS_URL
+from token_bucket import TokenBucket
 
 # Load environment variables from .env file
 load_dotenv()
 
 # Initialize rate limiter
-limiter = Limiter(key_func=get_remote_address)
+
+def rate_limit_key(request: Request) -> str:
+    """Rate limit signed-in users by account (rotating IPs doesn't reset it), guests by IP"""
+    authorization = request.headers.get("authorization", "")
+    if authorization.startswith("Bearer "):
+        token_data = verify_token(authorization[len("Bearer "):])
+        if token_data:
+            return f"user:{token_data.user_id}"
+    return get_remote_address(request)
+
+
+# Counters live in Redis when configured so every worker shares one budget;
+# the moving window avoids the 2x burst a fixed window allows at its edges
+limiter = Limiter(
+    key_func=rate_limit_key,
+    storage_uri=REDIS_URL or "memory://",
+    strategy="moving-window"
+)
+
+# Answer endpoints: a burst of up to 10 quick answers, 30 per minute sustained
+ANALYZE_BUCKET_CAPACITY = 10
+ANALYZE_REFILL_PER_MINUTE = 30
+analyze_bucket = TokenBucket(ANALYZE_BUCKET_CAPACITY, ANALYZE_REFILL_PER_MINUTE, session_store.redis)
+
+
+async def analyze_rate_limit(request: Request):
+    """Dependency: take a token from the caller's answer bucket or reject with 429"""
+    retry_after = await analyze_bucket.take("analyze:" + rate_limit_key(request))
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many answers in a short time. Please wait a moment and try again.",
+            headers={"Retry-After": str(int(retry_after) + 1)}
+        )
 
 
 # ============== APPLICATION LIFECYCLE ==============
 
+# Worker threads for sync endpoints and other blocking work
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", "64"))
+
+# Uvicorn answers 503 beyond this many in-flight connections instead of queueing
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "256"))
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifecycle - startup and shutdown"""
     # Startup
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=THREADPOOL_SIZE))
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
     await init_db()
+    await session_store.connect()
     print("🚀 AI Interviewer API started!")
     yield
     # Shutdown
+    await groq_http_client.aclose()
+    await session_store.close()
     await close_mongo_connection()
     print("👋 AI Interviewer API shutdown complete")
 
@@ -70,7 +137,9 @@ app = FastAPI(
     title="AI Mock Interviewer API",
     description="Backend API for AI-powered mock interview practice",
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    # Response dicts are encoded by orjson instead of the stdlib json module
+    default_response_class=ORJSONResponse
 )
 
 # Add rate limiter exception handler
@@ -82,7 +151,20 @@ GROQ_API_KEY = os.getenv("GROQ_API_KEY")
 if not GROQ_API_KEY:
     raise ValueError("GROQ_API_KEY not found in environment variables!")
 
-client = Groq(api_key=GROQ_API_KEY)
+# One keep-alive pool for every Groq call; HTTP/2 multiplexes concurrent
+# transcriptions and completions over a few TLS connections
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "200"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "100"))
+
+groq_http_client = httpx.AsyncClient(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=GROQ_MAX_CONNECTIONS,
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS
+    ),
+    timeout=httpx.Timeout(60.0, connect=5.0)
+)
+client = AsyncGroq(api_key=GROQ_API_KEY, http_client=groq_http_client)
 
 app.add_middleware(
     CORSMiddleware,
@@ -90,8 +172,82 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag"],
 )
 
+
+# ============== RESPONSE COMPRESSION ==============
+
+GZIP_MINIMUM_SIZE = 1024
+GZIP_COMPRESS_LEVEL = 5
+
+
+class JSONGZipMiddleware:
+    """Gzip JSON bodies only; audio and event streams pass through untouched and unbuffered.
+    Plain ASGI, so it doesn't depend on starlette's GZipResponder internals."""
+
+    def __init__(self, app, minimum_size: int = GZIP_MINIMUM_SIZE, compresslevel: int = GZIP_COMPRESS_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.compresslevel = compresslevel
+
+    def _gzip_headers(self, start_message: dict, content_length: Optional[int]):
+        """Mark a held response start as gzip-encoded"""
+        headers = MutableHeaders(raw=start_message["headers"])
+        headers["Content-Encoding"] = "gzip"
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        headers.add_vary_header("Accept-Encoding")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or "gzip" not in Headers(scope=scope).get("accept-encoding", ""):
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor = None
+
+        async def send_json_gzipped(message):
+            nonlocal start_message, compressor
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if headers.get("content-type", "").startswith("application/json") and "content-encoding" not in headers:
+                    # Hold the headers until the first body message shows how big it is
+                    start_message = message
+                    return
+            elif message["type"] == "http.response.body" and start_message is not None:
+                body = message.get("body", b"")
+                more_body = message.get("more_body", False)
+                
+                if compressor is None and not more_body:
+                    # Whole body in one message: compress only if it's worth it
+                    if len(body) >= self.minimum_size:
+                        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+                        body = compressor.compress(body) + compressor.flush()
+                        self._gzip_headers(start_message, len(body))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                
+                # Streamed JSON (exports): compress chunk by chunk without buffering
+                if compressor is None:
+                    compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, 31)
+                    self._gzip_headers(start_message, None)
+                    await send(start_message)
+                chunk = compressor.compress(body)
+                if not more_body:
+                    chunk += compressor.flush()
+                await send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_json_gzipped)
+
+
+app.add_middleware(JSONGZipMiddleware, minimum_size=GZIP_MINIMUM_SIZE, compresslevel=GZIP_COMPRESS_LEVEL)
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -100,50 +256,75 @@ async def health_check():
         "status": "healthy",
         "service": "ai-interviewer-api",
         "version": "2.0.0",
-        "database": "mongodb"
+        "database": "mongodb",
+        "session_store": "redis" if session_store.is_shared else "memory"
     }
 
-# Local cache for active sessions (backed by MongoDB for persistence)
-interview_sessions = {}
+
+# Active sessions live in session_store (Redis when REDIS_URL is set, else an
+# in-process TTL cache) and are backed by MongoDB for recovery after restarts
 
 
 async def get_session(session_id: str) -> dict:
-    """Get session from local cache or MongoDB (for recovery after restart)"""
-    # Try local cache first (fastest)
-    if session_id in interview_sessions:
-        return interview_sessions[session_id]
+    """Get session from the session store or MongoDB (for recovery after restart)"""
+    # Try the session store first (fastest)
+    session = await session_store.get(session_id)
+    if session is not None:
+        # Redis keeps expression samples out of the session blob, so its stored metrics may be stale
+        if session_store.is_shared and session.get("expression_totals"):
+            update_video_metrics(session)
+        return session
     
     # Try MongoDB (handles server restarts on Render)
     session = await get_active_session(session_id)
     if session:
-        # Restore to local cache
-        interview_sessions[session_id] = session
+        # Storage metadata - MongoDB manages these on its own document
+        session.pop("created_at", None)
+        session.pop("updated_at", None)
+        # Restore to the session store
+        await session_store.set(session_id, session)
         return session
     
     return None
 
 
+def _session_document(session_data: dict) -> dict:
+    """Build the MongoDB-safe copy of a session (BSON cannot encode deques)"""
+    document = dict(session_data)
+    if isinstance(document.get("expression_history"), deque):
+        document["expression_history"] = list(document["expression_history"])
+    return document
+
+
 async def save_session(session_id: str, session_data: dict):
-    """Save session to both local cache and MongoDB"""
-    # Save to local cache
-    interview_sessions[session_id] = session_data
+    """Save session to the session store, mirrored to MongoDB unless Redis holds it"""
+    # Save to the session store
+    await session_store.set(session_id, session_data)
+    
+    # Redis already outlives app restarts, so the MongoDB mirror is only
+    # needed for the in-process store
+    if session_store.is_shared:
+        return
     
     # Persist to MongoDB (handles Render restarts)
     try:
+        document = _session_document(session_data)
         existing = await get_active_session(session_id)
         if existing:
-            await update_active_session(session_id, session_data)
+            await update_active_session(session_id, document)
         else:
-            await create_active_session(session_id, session_data)
+            await create_active_session(session_id, document)
     except Exception as e:
         print(f"Warning: Could not persist session to MongoDB: {e}")
 
 
 async def remove_session(session_id: str):
-    """Remove session from both local cache and MongoDB"""
-    # Remove from local cache
-    if session_id in interview_sessions:
-        del interview_sessions[session_id]
+    """Remove session from the session store and its MongoDB mirror"""
+    # Remove from the session store
+    await session_store.delete(session_id)
+    
+    if session_store.is_shared:
+        return
     
     # Remove from MongoDB
     try:
@@ -152,6 +333,27 @@ async def remove_session(session_id: str):
         print(f"Warning: Could not remove session from MongoDB: {e}")
 
 
+# Transcript labels for prompt building (unknown roles fall back to .upper())
+ROLE_LABELS = {"user": "USER", "assistant": "ASSISTANT", "system": "SYSTEM"}
+
+
+def format_transcript(messages) -> str:
+    """Render chat messages as "ROLE: content" lines for LLM prompts"""
+    return "\n".join(
+        f"{ROLE_LABELS.get(msg['role']) or msg['role'].upper()}: {msg['content']}"
+        for msg in messages
+    )
+
+
+# Score marker the interviewer appends to each reply, e.g. "[SCORE: 7/10]"
+_SCORE_RE = re.compile(r'\s*\[SCORE:\s*\d+/10\]')
+_SCORE_VALUE_RE = re.compile(r'\[SCORE:\s*(\d+)/10\]')
+
+# Video replies may carry fractional scores, e.g. "[SCORE: 7.5/10]"
+_VIDEO_SCORE_RE = re.compile(r'\s*\[SCORE:\s*\d+(?:\.\d+)?/10\]')
+_VIDEO_SCORE_VALUE_RE = re.compile(r'\[SCORE:\s*(\d+(?:\.\d+)?)/10\]')
+
+
 def ensure_complete_sentences(text: str) -> str:
     """Trim LLM output to the last complete sentence.
     
@@ -176,6 +378,136 @@ def ensure_complete_sentences(text: str) -> str:
     return text
 
 
+async def read_audio_upload(file: UploadFile) -> tuple:
+    """Read an uploaded recording into a (filename, bytes) pair for Whisper.
+    The extension tells Whisper the container format."""
+    return (file.filename or "audio.webm", await file.read())
+
+
+class CompletionTruncated(Exception):
+    """A JSON-mode reply stopped at max_tokens, so it is not a complete document"""
+
+    def __init__(self, partial: str):
+        super().__init__("Completion truncated at max_tokens")
+        self.partial = partial
+
+
+async def cached_completion(
+    messages: List[dict],
+    temperature: float,
+    max_tokens: int,
+    model: str = "llama-3.3-70b-versatile",
+    json_mode: bool = False
+) -> str:
+    """Get chat completion text, reusing cached responses for identical prompts.
+    Raises CompletionTruncated if a JSON-mode reply hits max_tokens."""
+    # JSON mode is part of the cache key, so a prose reply is never served
+    # to a JSON-mode caller for the same messages (or vice versa)
+    extra = {"response_format": {"type": "json_object"}} if json_mode else {}
+    
+    async def compute() -> str:
+        completion = await client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            **extra
+        )
+        choice = completion.choices[0]
+        # Raising keeps a cut-off JSON document out of the cache
+        if json_mode and choice.finish_reason == "length":
+            raise CompletionTruncated(choice.message.content or "")
+        return choice.message.content
+
+    return await llm_cache.get_or_compute(model, messages, temperature, max_tokens, compute, json_mode=json_mode)
+
+
+async def stream_completion(
+    messages: List[dict],
+    temperature: float,
+    max_tokens: int,
+    model: str = "llama-3.3-70b-versatile",
+    use_cache: bool = True,
+    json_mode: bool = False
+):
+    """Yield chat completion text as it is generated (cached responses arrive in one piece).
+    Raises CompletionTruncated after the last token if a JSON-mode reply hits max_tokens."""
+    if use_cache:
+        cached = llm_cache.get(model, messages, temperature, max_tokens, json_mode)
+        if cached is not None:
+            yield cached
+            return
+    
+    stream = await client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        max_tokens=max_tokens,
+        stream=True,
+        **({"response_format": {"type": "json_object"}} if json_mode else {})
+    )
+    parts = []
+    finish_reason = None
+    async for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            parts.append(delta)
+            yield delta
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+    # Same contract as cached_completion: a cut-off JSON document is neither cached nor final
+    if json_mode and finish_reason == "length":
+        raise CompletionTruncated("".join(parts))
+    if use_cache:
+        llm_cache.set(model, messages, temperature, max_tokens, "".join(parts), json_mode)
+
+
+# Minimum gap between streamed interviewer tokens (0 = send as generated). A steady
+# pace hides Groq's bursty delivery; tokens that arrive late are never held back.
+STREAM_TOKEN_INTERVAL_MS = int(os.getenv("STREAM_TOKEN_INTERVAL_MS", "0"))
+
+
+async def paced_tokens(tokens):
+    """Release token k no earlier than k intervals after the first token"""
+    if STREAM_TOKEN_INTERVAL_MS <= 0:
+        async for token in tokens:
+            yield token
+        return
+    
+    interval = STREAM_TOKEN_INTERVAL_MS / 1000
+    first_at = None
+    released = 0
+    async for token in tokens:
+        now = time.monotonic()
+        if first_at is None:
+            first_at = now
+        elif first_at + released * interval > now:
+            await asyncio.sleep(first_at + released * interval - now)
+        released += 1
+        yield token
+
+
+def sse_event(data: dict) -> str:
+    """Format a Server-Sent Events message"""
+    return f"data: {json.dumps(data, default=str)}\n\n"
+
+
+# Runs of spaces/tabs and blank lines in pasted or extracted documents
+_INLINE_SPACE_RE = re.compile(r'[ \t\r\f\v]+')
+_LINE_BREAK_RE = re.compile(r' ?\n\s*')
+
+
+def clip_for_prompt(text: str, max_chars: int) -> str:
+    """Fit user-supplied text into a prompt budget: collapse whitespace runs (which
+    cost tokens but carry nothing) first, then cut at the last word boundary"""
+    text = _LINE_BREAK_RE.sub("\n", _INLINE_SPACE_RE.sub(" ", text)).strip()
+    if len(text) <= max_chars:
+        return text
+    cut = max(text.rfind(" ", 0, max_chars), text.rfind("\n", 0, max_chars))
+    return text[:cut if cut > max_chars // 2 else max_chars]
+
+
 # Language code mapping for Whisper and TTS
 LANGUAGE_CODES = {
     'en-US': 'en', 'en-GB': 'en', 'en-IN': 'en',
@@ -418,6 +750,76 @@ Keep responses conversational (under 50 words). Be encouraging but honest about
     }
 }
 
+# Topic + company + difficulty part of every system prompt, built once for all combinations.
+# Resume, job description and language sections are appended per session.
+BASE_SYSTEM_PROMPTS = {
+    (topic, company, difficulty): f"""{topic_config["system_prompt"]}
+
+{company_config["style"]}
+
+{difficulty_config["prompt_modifier"]}"""
+    for topic, topic_config in INTERVIEW_TOPICS.items()
+    for company, company_config in COMPANY_STYLES.items()
+    for difficulty, difficulty_config in DIFFICULTY_CONFIGS.items()
+}
+
+SCORING_INSTRUCTIONS = """
+
+IMPORTANT INSTRUCTIONS:
+- After each candidate response, provide a brief score (1-10) at the END of your response in this exact format: [SCORE: X/10]
+- The score should reflect: accuracy, depth, communication clarity, and relevance
+- Keep your main response under 60 words, then add the score
+- Adapt your next question difficulty based on their performance
+- Use natural speech patterns with fillers like "I see...", "Interesting!", "Let me ask you about..."
+- Vary your tone: be encouraging after good answers, gently redirecting after weak ones"""
+
+# Opening messages, rendered with str.format when a session starts.
+# Resume openings only fill in the optional fragments for details found in the resume.
+RESUME_OPENING_TEMPLATES = {
+    "dsa": {
+        "template": "Hi {name}! Great to meet you. I've reviewed your background{role} and I'm excited to dive into some DSA questions. {project}Let's start with something foundational: Can you walk me through how you'd implement a hash map from scratch?",
+        "role": " as a {}",
+        "project": "I noticed you worked on {} - we might touch on that later. "
+    },
+    "system_design": {
+        "template": "Welcome {name}! I see you have experience{role}{skill}. {project}Let's discuss system design - imagine you need to design a system similar to something you've built before. How would you approach designing a scalable notification service?",
+        "role": " as a {}",
+        "skill": " with {}",
+        "project": "Your work on {} caught my eye. "
+    },
+    "behavioral": {
+        "template": "Hi {name}! Thanks for joining me today. I've looked through your background{role} looks really interesting. {project}But first, tell me a bit about yourself and what you're looking for in your next opportunity?",
+        "role": " and your role as {}",
+        "project": "I’d love to hear about {} in more detail. "
+    },
+    "frontend": {
+        "template": "Hello {name}! I see you have frontend experience{skill}{role}. {project}Let's start by discussing something you've likely encountered - how would you optimize the performance of a React application that's getting slow?",
+        "role": " as a {}",
+        "skill": " with {}",
+        "project": "The {} project sounds interesting! "
+    },
+    "backend": {
+        "template": "Welcome {name}! Your background{role}{skill} is impressive. {project}Let's dive into backend concepts - can you tell me about your experience with database design and when you'd choose SQL vs NoSQL?",
+        "role": " as a {}",
+        "skill": " working with {}",
+        "project": "I'm curious about {}. "
+    },
+    "general": {
+        "template": "Hi {name}! Great to connect with you. I've reviewed your resume{role} looks like a great background. {project}Let's start with what you're most proud of from your recent work experience?",
+        "role": " - {}",
+        "project": "I'd love to hear about {}. "
+    }
+}
+
+BASE_OPENING_TEMPLATES = {
+    "dsa": "Hello {name}! I'll be your interviewer today, and we'll be doing this {company}-style. Let's warm up with Data Structures & Algorithms. Can you explain what a hash table is and walk me through when you'd use one in practice?",
+    "system_design": "Welcome {name}! I'm excited to do this system design interview with you, {company}-style. Let's start with a classic: How would you design a URL shortener like bit.ly? Feel free to think out loud.",
+    "behavioral": "Hi {name}! I'm really looking forward to getting to know you today. This will be a {company}-style behavioral interview. To kick things off, tell me about yourself and what's driving you to explore new opportunities?",
+    "frontend": "Hello {name}! Let's have some fun with frontend development today, {company}-style. To get started, can you explain the practical differences between let, const, and var in JavaScript?",
+    "backend": "Welcome {name}! Let's explore backend development together with a {company} approach. To warm up, what's your experience with SQL vs NoSQL databases, and how do you decide which to use?",
+    "general": "Hello {name}! Welcome to your mock interview. I'm here to help you practice and improve. Let's start with something you know well - tell me about a recent project you've worked on that you're proud of."
+}
+
 # Achievements definitions
 ACHIEVEMENTS = [
     {"id": "first_interview", "name": "First Steps", "description": "Complete your first interview", "xp_reward": 50, "icon": "🎯"},
@@ -434,6 +836,8 @@ ACHIEVEMENTS = [
     {"id": "interviews_20", "name": "Interview Pro", "description": "Complete 20 interviews", "xp_reward": 400, "icon": "🎓"},
 ]
 
+ACHIEVEMENTS_BY_ID = {achievement["id"]: achievement for achievement in ACHIEVEMENTS}
+
 
 class InterviewSession(BaseModel):
     topic: str = "general"
@@ -585,6 +989,7 @@ async def update_me(
     
     if update_data:
         updated_user = await update_user(current_user["_id"], update_data)
+        await invalidate_dashboard(current_user["_id"])
         if updated_user:
             return user_to_response(updated_user)
     
@@ -675,44 +1080,50 @@ def get_difficulties():
     }
 
 
+# Groq TTS voices, tried in order (Ariana is warmer; Fritz is the fallback)
+TTS_VOICES = ["Ariana-PlayHT", "Fritz-PlayHT"]
+TTS_CHUNK_SIZE = 8192
+
+
+async def stream_speech(response, exit_stack: AsyncExitStack):
+    """Forward synthesized audio as it arrives, releasing the upstream response as soon as it ends"""
+    try:
+        async for chunk in response.iter_bytes(TTS_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await exit_stack.aclose()
+
+
 @app.post("/tts")
 async def text_to_speech(request: TextToSpeechRequest):
-    """Convert text to speech using Groq's enhanced TTS with better voice"""
-    try:
-        # Use a more natural, professional female voice for the interviewer
-        # Available PlayHT voices: Fritz, Ariana, Jennifer, etc.
-        # Ariana provides a warmer, more professional interview tone
-        response = client.audio.speech.create(
-            model="playht-tts",
-            voice="Ariana-PlayHT",  # Warmer, more natural female voice
-            input=request.text,
-            response_format="wav"
-        )
+    """Convert text to speech using Groq's enhanced TTS with better voice.
+    Audio is streamed to the client while Groq is still synthesizing."""
+    last_error = None
+    for voice in TTS_VOICES:
+        exit_stack = AsyncExitStack()
+        try:
+            response = await exit_stack.enter_async_context(
+                client.audio.speech.with_streaming_response.create(
+                    model="playht-tts",
+                    voice=voice,
+                    input=request.text,
+                    response_format="wav"
+                )
+            )
+        except Exception as e:
+            print(f"TTS Error ({voice}): {e}")
+            last_error = e
+            continue
         
-        audio_bytes = response.read()
+        # The background task also closes the upstream response if the body is never iterated
         return StreamingResponse(
-            io.BytesIO(audio_bytes),
+            stream_speech(response, exit_stack),
             media_type="audio/wav",
-            headers={"Content-Disposition": "inline; filename=speech.wav"}
+            headers={"Content-Disposition": "inline; filename=speech.wav"},
+            background=BackgroundTask(exit_stack.aclose)
         )
-    except Exception as e:
-        print(f"TTS Error: {e}")
-        # Fallback to Fritz if Ariana fails
-        try:
-            response = client.audio.speech.create(
-                model="playht-tts",
-                voice="Fritz-PlayHT",
-                input=request.text,
-                response_format="wav"
-            )
-            audio_bytes = response.read()
-            return StreamingResponse(
-                io.BytesIO(audio_bytes),
-                media_type="audio/wav",
-                headers={"Content-Disposition": "inline; filename=speech.wav"}
-            )
-        except Exception as fallback_error:
-            raise HTTPException(status_code=500, detail=f"TTS failed: {str(fallback_error)}")
+    
+    raise HTTPException(status_code=500, detail=f"TTS failed: {str(last_error)}")
 
 
 @app.get("/tts/voices")
@@ -743,7 +1154,7 @@ async def parse_resume(file: UploadFile = File(...)):
         extraction_prompt = f"""Analyze this resume thoroughly and extract information for a technical interview:
 
 RESUME TEXT:
-{resume_text[:5000]}
+{clip_for_prompt(resume_text, 5000)}
 
 Extract and return in this EXACT format (be specific and detailed):
 
@@ -760,15 +1171,13 @@ SUGGESTED_QUESTIONS: [5 specific interview questions based on THIS resume, refer
 
 Be factual and specific. The questions should directly reference items from the resume."""
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": extraction_prompt}],
+        # Re-uploads of the same resume hit the completion cache
+        parsed_info = await cached_completion(
+            [{"role": "user", "content": extraction_prompt}],
             temperature=0.3,
             max_tokens=800
         )
         
-        parsed_info = completion.choices[0].message.content
-        
         return {
             "success": True,
             "raw_text": resume_text[:3000],
@@ -788,7 +1197,7 @@ async def analyze_job_description(job_description: str = Form(...)):
         analysis_prompt = f"""Analyze this job description and extract key information:
 
 JOB DESCRIPTION:
-{job_description[:3000]}
+{clip_for_prompt(job_description, 3000)}
 
 Extract and return:
 1. ROLE: Job title and level
@@ -799,15 +1208,13 @@ Extract and return:
 
 Be concise and actionable."""
 
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": analysis_prompt}],
+        # The same JD is often analyzed for many candidates
+        analysis = await cached_completion(
+            [{"role": "user", "content": analysis_prompt}],
             temperature=0.3,
             max_tokens=400
         )
         
-        analysis = completion.choices[0].message.content
-        
         return {
             "success": True,
             "analysis": analysis
@@ -818,6 +1225,31 @@ Be concise and actionable."""
         raise HTTPException(status_code=500, detail=f"Failed to analyze job description: {str(e)}")
 
 
+# Fields read from parsed resume text (see /resume/parse) for the opening message
+_RESUME_NAME_RE = re.compile(r'NAME:\s*([^\n]+)')
+_RESUME_PROJECT_RE = re.compile(r'(?:NOTABLE_PROJECTS|KEY_PROJECTS|PROJECTS):\s*([^\n]+)', re.IGNORECASE)
+_RESUME_SKILL_RE = re.compile(r'(?:TOP_SKILLS|SKILLS):\s*([^\n,]+)', re.IGNORECASE)
+_RESUME_ROLE_RE = re.compile(r'(?:CURRENT_ROLE|ROLE):\s*([^\n]+)', re.IGNORECASE)
+
+
+def build_resume_opening(topic: str, name: str, role: Optional[str], skill: Optional[str], project: Optional[str]) -> str:
+    """Render the resume-aware opening message for a topic"""
+    config = RESUME_OPENING_TEMPLATES.get(topic, RESUME_OPENING_TEMPLATES["general"])
+    return config["template"].format(
+        name=name,
+        role=config.get("role", "").format(role) if role else "",
+        skill=config.get("skill", "").format(skill) if skill else "",
+        project=config.get("project", "").format(project) if project else ""
+    )
+
+
+@lru_cache(maxsize=256)
+def build_base_opening(topic: str, company_name: str, name: str) -> str:
+    """Render the generic opening message (static per topic/company/name, so cached)"""
+    template = BASE_OPENING_TEMPLATES.get(topic, BASE_OPENING_TEMPLATES["general"])
+    return template.format(name=name, company=company_name)
+
+
 @app.post("/interview/start")
 @limiter.limit("20/minute")
 async def start_interview(
@@ -829,16 +1261,14 @@ async def start_interview(
     session_id = str(uuid.uuid4())
     start_time = time.time()
     
-    topic_config = INTERVIEW_TOPICS.get(session.topic, INTERVIEW_TOPICS["general"])
-    company_config = COMPANY_STYLES.get(session.company_style, COMPANY_STYLES["default"])
-    difficulty_config = DIFFICULTY_CONFIGS.get(session.difficulty, DIFFICULTY_CONFIGS["medium"])
+    topic_key = session.topic if session.topic in INTERVIEW_TOPICS else "general"
+    company_key = session.company_style if session.company_style in COMPANY_STYLES else "default"
+    difficulty_key = session.difficulty if session.difficulty in DIFFICULTY_CONFIGS else "medium"
+    topic_config = INTERVIEW_TOPICS[topic_key]
+    company_config = COMPANY_STYLES[company_key]
     
     # Build comprehensive system prompt
-    full_system_prompt = f"""{topic_config["system_prompt"]}
-
-{company_config["style"]}
-
-{difficulty_config["prompt_modifier"]}"""
+    full_system_prompt = BASE_SYSTEM_PROMPTS[(topic_key, company_key, difficulty_key)]
 
     if session.resume_text:
         full_system_prompt += f"""
@@ -846,7 +1276,7 @@ async def start_interview(
 ═══════════════════════════════════════════════════════════
 CANDIDATE'S RESUME - CRITICAL: USE THIS FOR PERSONALIZED QUESTIONS
 ═══════════════════════════════════════════════════════════
-{session.resume_text[:2500]}
+{clip_for_prompt(session.resume_text, 2500)}
 
 🎯 MANDATORY RESUME-BASED QUESTIONING RULES:
 1. Your FIRST 2-3 questions MUST directly reference something from their resume
@@ -867,19 +1297,11 @@ DO NOT ask generic questions when you have resume context. Make every question f
         full_system_prompt += f"""
 
 TARGET JOB DESCRIPTION:
-{session.job_description[:1500]}
+{clip_for_prompt(session.job_description, 1500)}
 
 Focus your questions on skills and requirements mentioned in this job description."""
 
-    full_system_prompt += """
-
-IMPORTANT INSTRUCTIONS:
-- After each candidate response, provide a brief score (1-10) at the END of your response in this exact format: [SCORE: X/10]
-- The score should reflect: accuracy, depth, communication clarity, and relevance
-- Keep your main response under 60 words, then add the score
-- Adapt your next question difficulty based on their performance
-- Use natural speech patterns with fillers like "I see...", "Interesting!", "Let me ask you about..."
-- Vary your tone: be encouraging after good answers, gently redirecting after weak ones"""
+    full_system_prompt += SCORING_INSTRUCTIONS
 
     # Add language-specific prompt if not English
     whisper_lang = LANGUAGE_CODES.get(session.language, 'en')
@@ -902,46 +1324,30 @@ All questions, feedback, and responses should be in this language.
     
     if session.resume_text:
         # Extract name
-        name_match = re.search(r'NAME:\s*([^\n]+)', session.resume_text)
+        name_match = _RESUME_NAME_RE.search(session.resume_text)
         candidate_name = name_match.group(1).strip() if name_match else "there"
         
         # Extract a project to reference
-        project_match = re.search(r'(?:NOTABLE_PROJECTS|KEY_PROJECTS|PROJECTS):\s*([^\n]+)', session.resume_text, re.IGNORECASE)
+        project_match = _RESUME_PROJECT_RE.search(session.resume_text)
         if project_match:
             resume_project = project_match.group(1).strip()[:100]
         
         # Extract top skill
-        skill_match = re.search(r'(?:TOP_SKILLS|SKILLS):\s*([^\n,]+)', session.resume_text, re.IGNORECASE)
+        skill_match = _RESUME_SKILL_RE.search(session.resume_text)
         if skill_match:
             resume_skill = skill_match.group(1).strip()
             
         # Extract current role
-        role_match = re.search(r'(?:CURRENT_ROLE|ROLE):\s*([^\n]+)', session.resume_text, re.IGNORECASE)
+        role_match = _RESUME_ROLE_RE.search(session.resume_text)
         if role_match:
             resume_role = role_match.group(1).strip()
     
     # Generate resume-aware openings if resume is available
     if session.resume_text and (resume_project or resume_skill or resume_role):
-        resume_openings = {
-            "dsa": f"Hi {candidate_name}! Great to meet you. I've reviewed your background{' as a ' + resume_role if resume_role else ''} and I'm excited to dive into some DSA questions. {('I noticed you worked on ' + resume_project + ' - we might touch on that later. ') if resume_project else ''}Let's start with something foundational: Can you walk me through how you'd implement a hash map from scratch?",
-            "system_design": f"Welcome {candidate_name}! I see you have experience{' as a ' + resume_role if resume_role else ''}{(' with ' + resume_skill) if resume_skill else ''}. {('Your work on ' + resume_project + ' caught my eye. ') if resume_project else ''}Let's discuss system design - imagine you need to design a system similar to something you've built before. How would you approach designing a scalable notification service?",
-            "behavioral": f"Hi {candidate_name}! Thanks for joining me today. I've looked through your background{' and your role as ' + resume_role if resume_role else ''} looks really interesting. {('I’d love to hear about ' + resume_project + ' in more detail. ') if resume_project else ''}But first, tell me a bit about yourself and what you're looking for in your next opportunity?",
-            "frontend": f"Hello {candidate_name}! I see you have frontend experience{(' with ' + resume_skill) if resume_skill else ''}{' as a ' + resume_role if resume_role else ''}. {('The ' + resume_project + ' project sounds interesting! ') if resume_project else ''}Let's start by discussing something you've likely encountered - how would you optimize the performance of a React application that's getting slow?",
-            "backend": f"Welcome {candidate_name}! Your background{' as a ' + resume_role if resume_role else ''}{(' working with ' + resume_skill) if resume_skill else ''} is impressive. {('I\'m curious about ' + resume_project + '. ') if resume_project else ''}Let's dive into backend concepts - can you tell me about your experience with database design and when you'd choose SQL vs NoSQL?",
-            "general": f"Hi {candidate_name}! Great to connect with you. I've reviewed your resume{' - ' + resume_role if resume_role else ''} looks like a great background. {('I\'d love to hear about ' + resume_project + '. ') if resume_project else ''}Let's start with what you're most proud of from your recent work experience?"
-        }
-        opening = resume_openings.get(session.topic, resume_openings["general"])
+        opening = build_resume_opening(session.topic, candidate_name, resume_role, resume_skill, resume_project)
     else:
         # Fallback to generic but natural openings
-        base_openings = {
-            "dsa": f"Hello {candidate_name}! I'll be your interviewer today, and we'll be doing this {company_config['name']}-style. Let's warm up with Data Structures & Algorithms. Can you explain what a hash table is and walk me through when you'd use one in practice?",
-            "system_design": f"Welcome {candidate_name}! I'm excited to do this system design interview with you, {company_config['name']}-style. Let's start with a classic: How would you design a URL shortener like bit.ly? Feel free to think out loud.",
-            "behavioral": f"Hi {candidate_name}! I'm really looking forward to getting to know you today. This will be a {company_config['name']}-style behavioral interview. To kick things off, tell me about yourself and what's driving you to explore new opportunities?",
-            "frontend": f"Hello {candidate_name}! Let's have some fun with frontend development today, {company_config['name']}-style. To get started, can you explain the practical differences between let, const, and var in JavaScript?",
-            "backend": f"Welcome {candidate_name}! Let's explore backend development together with a {company_config['name']} approach. To warm up, what's your experience with SQL vs NoSQL databases, and how do you decide which to use?",
-            "general": f"Hello {candidate_name}! Welcome to your mock interview. I'm here to help you practice and improve. Let's start with something you know well - tell me about a recent project you've worked on that you're proud of."
-        }
-        opening = base_openings.get(session.topic, base_openings["general"])
+        opening = build_base_opening(session.topic, company_config["name"], candidate_name)
     
     # Get user_id if authenticated
     user_id = current_user["_id"] if current_user else None
@@ -956,6 +1362,10 @@ All questions, feedback, and responses should be in this language.
         "system_prompt": full_system_prompt,
         "history": [{"role": "assistant", "content": opening}],
         "scores": [],
+        "score_sum": 0,
+        "score_count": 0,
+        "score_min": None,
+        "score_max": None,
         "question_count": 1,
         "enable_tts": session.enable_tts,
         "current_difficulty_adjustment": 0,
@@ -968,7 +1378,8 @@ All questions, feedback, and responses should be in this language.
         "language": session.language,
         "whisper_lang": whisper_lang,
         # Video mode specific data
-        "expression_history": [],
+        "expression_history": deque(maxlen=EXPRESSION_HISTORY_MAXLEN),
+        "expression_totals": {"count": 0, "confidence": 0.0, "eye_contact": 0.0, "engagement": 0.0, "emotions": {}},
         "video_metrics": {
             "avg_confidence": 0,
             "avg_eye_contact": 0,
@@ -1015,50 +1426,351 @@ All questions, feedback, and responses should be in this language.
     }
 
 
-@app.post("/interview/{session_id}/analyze")
-@limiter.limit("30/minute")
+# ============== SCORE AGGREGATES ==============
+
+def _score_stats(session: dict) -> dict:
+    """Return the session's running score aggregates, rebuilding them if stale"""
+    scores = session.setdefault("scores", [])
+    if session.get("score_count") != len(scores):
+        # Sessions restored from older documents lack the running totals
+        session["score_sum"] = sum(scores)
+        session["score_count"] = len(scores)
+        session["score_min"] = min(scores) if scores else None
+        session["score_max"] = max(scores) if scores else None
+    return session
+
+
+def record_score(session: dict, score):
+    """Append a score and update the running aggregates in O(1)"""
+    stats = _score_stats(session)
+    session["scores"].append(score)
+    stats["score_sum"] += score
+    stats["score_count"] += 1
+    stats["score_min"] = score if stats["score_min"] is None else min(stats["score_min"], score)
+    stats["score_max"] = score if stats["score_max"] is None else max(stats["score_max"], score)
+
+
+def score_average(session: dict) -> Optional[float]:
+    """Mean of the session's scores, or None before the first score"""
+    stats = _score_stats(session)
+    return stats["score_sum"] / stats["score_count"] if stats["score_count"] else None
+
+
+def score_trend(scores: List[float]) -> str:
+    """Compare the last score with the first: improving, declining or stable"""
+    if len(scores) < 2 or scores[-1] == scores[0]:
+        return "stable"
+    return "improving" if scores[-1] > scores[0] else "declining"
+
+
+@dataclass(frozen=True)
+class SessionView:
+    """Snapshot of the timer and score fields read by the polling endpoints"""
+    elapsed_seconds: int
+    remaining_seconds: int
+    duration_minutes: int
+    average_score: Optional[float]
+    min_score: Optional[float]
+    max_score: Optional[float]
+
+
+def _session_view(session: dict) -> SessionView:
+    """Compute timer and score values for a session in one pass"""
+    now = time.time()
+    elapsed_seconds = int(now - session.get("start_time", now))
+    duration_minutes = session.get("duration_minutes", 30)
+    stats = _score_stats(session)
+    return SessionView(
+        elapsed_seconds=elapsed_seconds,
+        remaining_seconds=max(0, (duration_minutes * 60) - elapsed_seconds),
+        duration_minutes=duration_minutes,
+        average_score=round(stats["score_sum"] / stats["score_count"], 1) if stats["score_count"] else None,
+        min_score=stats["score_min"],
+        max_score=stats["score_max"]
+    )
+
+
+# ============== INTERVIEW RECORDS ==============
+
+class InterviewRecord(TypedDict, total=False):
+    """Fields written to the interviews collection when a session is saved"""
+    session_id: str
+    user_id: Optional[str]
+    topic: str
+    topic_name: str
+    company_style: str
+    company_name: str
+    difficulty: str
+    duration_minutes: int
+    mode: str
+    has_resume: bool
+    has_job_description: bool
+    started_at: datetime
+    ended_at: datetime
+    duration_seconds: int
+    question_count: int
+    scores: list
+    average_score: Optional[float]
+    transcript: list
+    summary: str
+    status: str
+
+
+def _build_interview_doc(
+    session: dict,
+    status: str = "completed",
+    summary: Optional[str] = None,
+    duration_seconds: Optional[int] = None,
+    include_metadata: bool = False
+) -> InterviewRecord:
+    """Build the interview fields shared by every save path
+    
+    include_metadata adds the descriptive fields needed when creating a new
+    record (guest saves) rather than updating the one made at /start.
+    """
+    now = time.time()
+    start_time = session.get("start_time", now)
+    avg_score = score_average(session)
+    ended_at = datetime.fromtimestamp(now, tz=timezone.utc)
+    
+    doc: InterviewRecord = {
+        "question_count": session.get("question_count", 0),
+        "scores": session.get("scores", []),
+        "average_score": round(avg_score, 1) if avg_score is not None else None,
+        "transcript": session.get("history", []),
+        "ended_at": ended_at,
+        "duration_seconds": duration_seconds if duration_seconds is not None else int(now - start_time),
+        "status": status
+    }
+    if summary is not None:
+        doc["summary"] = summary
+    if include_metadata:
+        doc.update({
+            "user_id": session.get("user_id"),
+            "topic": session.get("topic", "general"),
+            "topic_name": session.get("topic_name", "General Technical"),
+            "company_style": session.get("company_style", "default"),
+            "company_name": session.get("company_name", "Standard"),
+            "difficulty": session.get("difficulty", "medium"),
+            "duration_minutes": session.get("duration_minutes", 30),
+            "mode": session.get("mode", "audio"),
+            "has_resume": session.get("has_resume", False),
+            "has_job_description": session.get("has_job_description", False),
+            "started_at": datetime.fromtimestamp(start_time, tz=timezone.utc)
+        })
+    return doc
+
+
+# ============== INTERVIEW CONVERSATION ==============
+
+# Transcript messages buffered before appending them to the interview document
+# (3 exchanges); end_interview writes whatever is left with the full transcript.
+TRANSCRIPT_FLUSH_TURNS = 6
+
+
+def take_pending_turns(session: dict) -> Tuple[List[dict], dict]:
+    """Detach the buffered transcript messages and snapshot the summary fields to write with them"""
+    pending_turns = session.get("pending_turns") or []
+    session["pending_turns"] = []
+    avg_score = score_average(session)
+    return pending_turns, {
+        "scores": list(session["scores"]),
+        "question_count": session["question_count"],
+        "average_score": round(avg_score, 1) if avg_score is not None else None
+    }
+
+
+# Once the conversation outgrows the window, older messages are folded into running
+# notes so the per-turn prompt stays bounded on long interviews (compressed in batches)
+HISTORY_WINDOW_MESSAGES = 10
+HISTORY_COMPRESS_BATCH = 6
+HISTORY_SUMMARY_MODEL = "llama-3.1-8b-instant"
+
+
+async def compress_history(session: dict):
+    """Fold history older than the window into session["history_summary"] (runs alongside transcription)"""
+    history = session["history"]
+    start = session.get("history_summarized", 0)
+    end = len(history) - HISTORY_WINDOW_MESSAGES
+    if end - start < HISTORY_COMPRESS_BATCH:
+        return
+    
+    exchanges = "\n".join(
+        f"{'Interviewer' if msg['role'] == 'assistant' else 'Candidate'}: {msg['content']}"
+        for msg in history[start:end]
+    )
+    prompt = f"""You keep notes for an interviewer during a mock interview. Update the notes with the new exchanges.
+
+CURRENT NOTES:
+{session.get("history_summary") or "None yet."}
+
+NEW EXCHANGES:
+{exchanges}
+
+Return the updated notes only: every question already asked, a one-line summary of each answer with its score, and any follow-up the interviewer promised. Be brief."""
+    
+    try:
+        summary = await cached_completion(
+            [{"role": "user", "content": prompt}],
+            temperature=0.3,
+            max_tokens=400,
+            model=HISTORY_SUMMARY_MODEL
+        )
+    except Exception as e:
+        print(f"⚠️ History compression failed, sending full history: {e}")
+        return
+    
+    session["history_summary"] = summary
+    session["history_summarized"] = end
+
+
+def conversation_messages(session: dict, system_prompt: str) -> List[dict]:
+    """System prompt, notes on compressed history (if any), then the recent messages"""
+    messages = [{"role": "system", "content": system_prompt}]
+    if session.get("history_summary"):
+        messages.append({
+            "role": "system",
+            "content": f"Notes on the earlier part of this interview:\n{session['history_summary']}"
+        })
+    messages.extend(session["history"][session.get("history_summarized", 0):])
+    return messages
+
+
+async def finish_turn(
+    session_id: str,
+    session: dict,
+    user_text: str,
+    ai_response: str,
+    background_tasks: Optional[BackgroundTasks] = None
+) -> dict:
+    """Score the interviewer reply, record the exchange (user turn and reply) and build the /analyze response.
+    With background_tasks the transcript flush runs after the response is sent."""
+    score = None
+    score_match = _SCORE_VALUE_RE.search(ai_response)
+    if score_match:
+        score = int(score_match.group(1))
+        record_score(session, score)
+        display_response = _SCORE_RE.sub('', ai_response).strip()
+        display_response = ensure_complete_sentences(display_response)
+    else:
+        display_response = ensure_complete_sentences(ai_response)
+    
+    # Calculate running average
+    avg_score = score_average(session)
+    
+    # Adaptive difficulty
+    if avg_score:
+        if avg_score >= 8 and session["current_difficulty_adjustment"] < 2:
+            session["current_difficulty_adjustment"] += 1
+        elif avg_score <= 4 and session["current_difficulty_adjustment"] > -2:
+            session["current_difficulty_adjustment"] -= 1
+    
+    session["history"].append({"role": "user", "content": user_text})
+    session["history"].append({"role": "assistant", "content": ai_response})
+    session["question_count"] += 1
+    
+    # Update MongoDB if user is authenticated (batched every few exchanges)
+    if session.get("user_id"):
+        pending_turns = session.setdefault("pending_turns", [])
+        pending_turns.extend(session["history"][-2:])
+        if len(pending_turns) >= TRANSCRIPT_FLUSH_TURNS:
+            turns, update_data = take_pending_turns(session)
+            if background_tasks is not None:
+                background_tasks.add_task(append_interview_turns, session_id, turns, update_data)
+            else:
+                await append_interview_turns(session_id, turns, update_data)
+    
+    # Save session state for persistence
+    await save_session(session_id, session)
+    
+    return {
+        "user_text": user_text, 
+        "ai_response": display_response,
+        "question_number": session["question_count"],
+        "history_length": len(session["history"]),
+        "score": score,
+        "average_score": round(avg_score, 1) if avg_score else None,
+        "total_scores": len(session["scores"]),
+        "difficulty_trend": "harder" if session["current_difficulty_adjustment"] > 0 else ("easier" if session["current_difficulty_adjustment"] < 0 else "stable")
+    }
+
+
+async def stream_turn(
+    session_id: str,
+    session: dict,
+    user_text: str,
+    messages: List[dict],
+    background_tasks: BackgroundTasks
+):
+    """SSE stream for /analyze: transcript event, reply tokens, then a done event
+    carrying the regular /analyze response (with the cleaned ai_response)"""
+    yield sse_event({"type": "transcript", "user_text": user_text})
+    
+    parts = []
+    try:
+        async for token in paced_tokens(stream_completion(messages, temperature=0.7, max_tokens=300, use_cache=False)):
+            parts.append(token)
+            yield sse_event({"type": "token", "token": token})
+        ai_response = "".join(parts)
+        print(f"AI said: {ai_response}")
+        
+        result = await finish_turn(session_id, session, user_text, ai_response, background_tasks)
+        yield sse_event({"type": "done", **result})
+    except Exception as e:
+        print(f"Error: {e}")
+        yield sse_event({"type": "error", "detail": str(e)})
+
+
+@app.post("/interview/{session_id}/analyze", dependencies=[Depends(analyze_rate_limit)])
 async def analyze_audio(
-    request: Request,
     session_id: str,
-    file: UploadFile = File(...)
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    stream: bool = False
 ):
-    """Process audio and continue the interview conversation"""
+    """Process audio and continue the interview conversation.
+    With stream=true the reply is sent as Server-Sent Events while it is generated."""
     
-    session = await get_session(session_id)
+    # Load the session while the upload is read off the spooled temp file
+    session, audio = await asyncio.gather(get_session(session_id), read_audio_upload(file))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found. Please start a new interview.")
     
     try:
-        # Save temporary file
-        temp_filename = f"temp_audio_{session_id}.webm"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
         # Get language for transcription from session
         whisper_lang = session.get("whisper_lang", "en")
         
-        # Transcribe audio with correct language
+        # Transcribe audio with correct language (straight from the upload, no temp file)
         print(f"Transcribing in {whisper_lang}...")
-        with open(temp_filename, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                file=(temp_filename, audio_file.read()),
+        transcription, _ = await asyncio.gather(
+            client.audio.transcriptions.create(
+                file=audio,
                 model="whisper-large-v3",
                 response_format="json",
                 language=whisper_lang,
-                temperature=0.0 
-            )
+                temperature=0.0
+            ),
+            compress_history(session)
+        )
+        
         user_text = transcription.text
         print(f"User said: {user_text}")
         
-        session["history"].append({"role": "user", "content": user_text})
-
-        # Build messages
-        messages = [{"role": "system", "content": session["system_prompt"]}]
-        messages.extend(session["history"])
+        # The user turn joins the session history only together with the reply (see
+        # finish_turn), so a failed or abandoned reply leaves no unanswered turn behind
+        messages = conversation_messages(session, session["system_prompt"])
+        messages.append({"role": "user", "content": user_text})
+        
+        if stream:
+            return StreamingResponse(
+                stream_turn(session_id, session, user_text, messages, background_tasks),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache"}
+            )
         
         # Generate AI Response
         print("Thinking...")
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=messages,
             temperature=0.7,
@@ -1067,79 +1779,99 @@ async def analyze_audio(
         ai_response = completion.choices[0].message.content
         print(f"AI said: {ai_response}")
         
-        # Extract score
-        score = None
-        score_match = re.search(r'\[SCORE:\s*(\d+)/10\]', ai_response)
-        if score_match:
-            score = int(score_match.group(1))
-            session["scores"].append(score)
-            display_response = re.sub(r'\s*\[SCORE:\s*\d+/10\]', '', ai_response).strip()
-            display_response = ensure_complete_sentences(display_response)
-        else:
-            display_response = ensure_complete_sentences(ai_response)
-        
-        # Calculate running average
-        avg_score = sum(session["scores"]) / len(session["scores"]) if session["scores"] else None
-        
-        # Adaptive difficulty
-        if avg_score:
-            if avg_score >= 8 and session["current_difficulty_adjustment"] < 2:
-                session["current_difficulty_adjustment"] += 1
-            elif avg_score <= 4 and session["current_difficulty_adjustment"] > -2:
-                session["current_difficulty_adjustment"] -= 1
-        
-        session["history"].append({"role": "assistant", "content": ai_response})
-        session["question_count"] += 1
-        
-        # Update MongoDB if user is authenticated
-        if session.get("user_id"):
-            await update_interview(session_id, {
-                "transcript": session["history"],
-                "scores": session["scores"],
-                "question_count": session["question_count"]
-            })
-        
-        # Save session state for persistence
-        await save_session(session_id, session)
-        
-        # Cleanup
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-
-        return {
-            "user_text": user_text, 
-            "ai_response": display_response,
-            "question_number": session["question_count"],
-            "history_length": len(session["history"]),
-            "score": score,
-            "average_score": round(avg_score, 1) if avg_score else None,
-            "total_scores": len(session["scores"]),
-            "difficulty_trend": "harder" if session["current_difficulty_adjustment"] > 0 else ("easier" if session["current_difficulty_adjustment"] < 0 else "stable")
-        }
+        return await finish_turn(session_id, session, user_text, ai_response, background_tasks)
 
     except Exception as e:
         print(f"Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+SUMMARY_FALLBACK = "Unable to generate summary. Please try again."
+EMPTY_INTERVIEW_SUMMARY = "No questions were answered, so there is nothing to assess yet."
+
+
+async def persist_interview(session_id: str, session: dict, result: dict):
+    """Store a finished interview (guests too, so it can be claimed later) and drop its live session"""
+    if session.get("user_id"):
+        await update_interview(
+            session_id,
+            _build_interview_doc(session, summary=result["summary"], duration_seconds=result["duration_seconds"])
+        )
+        await invalidate_dashboard(session["user_id"])
+        invalidate_completed_interview(session_id)
+    else:
+        # Save guest interview to DB without user_id so it can be claimed later
+        interview_data = _build_interview_doc(
+            session, summary=result["summary"], duration_seconds=result["duration_seconds"], include_metadata=True
+        )
+        interview_data["session_id"] = session_id
+        await create_interview_db(interview_data)
+    
+    await remove_session(session_id)
+
+
+async def stream_interview_end(session_id: str, session: dict, result: dict, summary_messages: List[dict]):
+    """SSE stream for /end: metadata event, summary tokens, then a done event"""
+    yield sse_event({"type": "metadata", "data": {k: v for k, v in result.items() if k != "summary"}})
+    
+    if result["summary"] is None:
+        parts = []
+        try:
+            async for token in stream_completion(summary_messages, temperature=0.5, max_tokens=500):
+                parts.append(token)
+                yield sse_event({"type": "token", "token": token})
+            result["summary"] = "".join(parts)
+        except Exception as e:
+            print(f"Summary stream error: {e}")
+            result["summary"] = SUMMARY_FALLBACK
+    
+    yield sse_event({"type": "done", "summary": result["summary"]})
+
+
+async def persist_streamed_end(
+    persist,
+    session_id: str,
+    session: dict,
+    result: dict,
+    summary_messages: List[dict],
+    max_tokens: int,
+    fallback: str
+):
+    """Background task for streamed /end and /video/end: runs even if the client disconnected.
+    A summary the client never received in full is generated again before storing."""
+    if result["summary"] is None:
+        try:
+            result["summary"] = await cached_completion(summary_messages, temperature=0.5, max_tokens=max_tokens)
+        except Exception:
+            result["summary"] = fallback
+    await persist(session_id, session, result)
+
+
 @app.post("/interview/{session_id}/end")
-async def end_interview(session_id: str):
-    """End the interview and get summary"""
+async def end_interview(session_id: str, background_tasks: BackgroundTasks, stream: bool = False):
+    """End the interview and get summary.
+    With stream=true the scores are sent first and the summary streams in as Server-Sent Events."""
     
     session = await get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    scores = session.get("scores", [])
-    avg_score = round(sum(scores) / len(scores), 1) if scores else None
-    min_score = min(scores) if scores else None
-    max_score = max(scores) if scores else None
+    stats = _score_stats(session)
+    scores = session["scores"]
+    avg_score = round(stats["score_sum"] / stats["score_count"], 1) if stats["score_count"] else None
+    min_score = stats["score_min"]
+    max_score = stats["score_max"]
     
-    start_time = session.get("start_time", time.time())
-    duration_seconds = int(time.time() - start_time)
+    now = time.time()
+    duration_seconds = int(now - session.get("start_time", now))
     
     # Generate summary using AI
     score_info = f"\nScores received: {scores}\nAverage score: {avg_score}/10" if scores else ""
+    # Long interviews reuse the running notes (see compress_history) for the early part
+    summarized = session.get("history_summarized", 0)
+    conversation = format_transcript(islice(session['history'], summarized, None))
+    if summarized:
+        conversation = f"(Notes on the earlier part of the interview)\n{session['history_summary']}\n\n(Most recent exchanges)\n{conversation}"
     
     summary_prompt = f"""Based on this interview conversation, provide a detailed performance summary:
     
@@ -1149,7 +1881,7 @@ Difficulty: {session['difficulty']}
 Number of exchanges: {session['question_count']}{score_info}
 
 Conversation:
-{chr(10).join([f"{msg['role'].upper()}: {msg['content']}" for msg in session['history']])}
+{conversation}
 
 Provide a structured assessment:
 1. **Overall Impression** (2-3 sentences)
@@ -1163,16 +1895,7 @@ Provide a structured assessment:
 
 Be constructive, specific, and actionable."""
 
-    try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": summary_prompt}],
-            temperature=0.5,
-            max_tokens=500
-        )
-        summary = completion.choices[0].message.content
-    except Exception:
-        summary = "Unable to generate summary. Please try again."
+    summary_messages = [{"role": "user", "content": summary_prompt}]
     
     result = {
         "session_id": session_id,
@@ -1185,58 +1908,182 @@ Be constructive, specific, and actionable."""
             "average": avg_score,
             "min": min_score,
             "max": max_score,
-            "trend": "improving" if len(scores) >= 2 and scores[-1] > scores[0] else ("declining" if len(scores) >= 2 and scores[-1] < scores[0] else "stable")
+            "trend": score_trend(scores)
         },
-        "summary": summary,
+        # Nothing to assess if the candidate never answered - skip the summary call
+        "summary": None if any(msg["role"] == "user" for msg in session["history"]) else EMPTY_INTERVIEW_SUMMARY,
         "history": session["history"],
         "duration_seconds": duration_seconds,
         "is_guest": session.get("user_id") is None
     }
     
-    # Update MongoDB if user is authenticated
-    if session.get("user_id"):
-        await update_interview(session_id, {
-            "scores": scores,
-            "average_score": avg_score,
-            "transcript": session["history"],
-            "summary": summary,
-            "question_count": session["question_count"],
-            "ended_at": datetime.utcnow(),
-            "duration_seconds": duration_seconds,
-            "status": "completed"
-        })
-    else:
-        # Save guest interview to DB without user_id so it can be claimed later
-        interview_data = {
-            "session_id": session_id,
-            "user_id": None,  # Will be linked when user saves to history
-            "topic": session.get("topic", "general"),
-            "topic_name": session.get("topic_name", "General Technical"),
-            "company_style": session.get("company_style", "default"),
-            "company_name": session.get("company_name", "Standard"),
-            "difficulty": session.get("difficulty", "medium"),
-            "duration_minutes": session.get("duration_minutes", 30),
-            "question_count": session.get("question_count", 0),
-            "scores": scores,
-            "average_score": avg_score,
-            "transcript": session.get("history", []),
-            "summary": summary,
-            "has_resume": bool(session.get("resume_text")),
-            "has_job_description": bool(session.get("job_description")),
-            "started_at": datetime.fromtimestamp(session.get("start_time", time.time())),
-            "ended_at": datetime.utcnow(),
-            "duration_seconds": duration_seconds,
-            "status": "completed"
-        }
-        await create_interview_db(interview_data)
+    # Streaming clients get the scores first, then summary tokens as they arrive
+    if stream:
+        return StreamingResponse(
+            stream_interview_end(session_id, session, result, summary_messages),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+            background=BackgroundTask(
+                persist_streamed_end, persist_interview, session_id, session, result,
+                summary_messages, 500, SUMMARY_FALLBACK
+            )
+        )
     
-    await remove_session(session_id)
+    # A retried /end for the same conversation reuses the cached summary
+    if result["summary"] is None:
+        try:
+            result["summary"] = await cached_completion(summary_messages, temperature=0.5, max_tokens=500)
+        except Exception:
+            result["summary"] = SUMMARY_FALLBACK
+    
+    # The client already has everything; storing it can happen after the response
+    background_tasks.add_task(persist_interview, session_id, session, result)
     
     return result
 
 
 # ============== VIDEO INTERVIEW ENDPOINTS ==============
 
+# Raw expression samples kept per session (~60s at the frontend's 10 Hz rate).
+# Averages come from running totals, so they still cover the whole interview.
+EXPRESSION_HISTORY_MAXLEN = 600
+
+# Static instructions go in the system message so every summary request shares
+# the same prompt prefix; per-session data follows in the user message.
+VIDEO_SUMMARY_RUBRIC = """Based on the VIDEO interview conversation and expression analysis provided, give a comprehensive assessment.
+
+Provide a structured VIDEO interview assessment:
+1. **Overall Impression** (considering both content AND body language)
+2. **Technical Performance** - Rate and explain
+3. **Communication & Presence** - Rate based on expression data
+4. **Confidence Analysis** - Based on the average confidence reported
+5. **Eye Contact Assessment** - Based on the eye contact reported
+6. **Body Language Strengths**
+7. **Body Language Areas to Improve**
+8. **Specific Recommendations** for video interviews
+9. **Final Overall Score**: X/10
+
+Be constructive and specific about video presence."""
+
+# Structured variant used for non-streaming requests: the model returns short
+# JSON fields (far fewer output tokens) and the server renders the Markdown.
+VIDEO_SUMMARY_SECTIONS = [
+    # (key, heading, kind) - kind is "text", "scored" or "list"
+    ("overall_impression", "Overall Impression", "text"),
+    ("technical_performance", "Technical Performance", "scored"),
+    ("communication_presence", "Communication & Presence", "scored"),
+    ("confidence_analysis", "Confidence Analysis", "text"),
+    ("eye_contact_assessment", "Eye Contact Assessment", "text"),
+    ("body_language_strengths", "Body Language Strengths", "list"),
+    ("body_language_improvements", "Body Language Areas to Improve", "list"),
+    ("recommendations", "Specific Recommendations", "list"),
+]
+
+VIDEO_SUMMARY_JSON_RUBRIC = """Based on the VIDEO interview conversation and expression analysis provided, assess the candidate on both content AND body language. Be constructive, specific and brief.
+
+Respond with ONLY a JSON object with these keys:
+- "overall_impression": 1-2 sentences
+- "technical_performance": {"score": 1-10, "comment": one sentence}
+- "communication_presence": {"score": 1-10, "comment": one sentence based on expression data}
+- "confidence_analysis": one sentence based on the average confidence reported
+- "eye_contact_assessment": one sentence based on the eye contact reported
+- "body_language_strengths": up to 3 short phrases
+- "body_language_improvements": up to 3 short phrases
+- "recommendations": up to 3 short, specific recommendations for video interviews
+- "final_score": overall score 1-10"""
+
+
+def render_video_summary(data: dict) -> str:
+    """Render the structured video summary as the numbered Markdown assessment"""
+    lines = []
+    for number, (key, heading, kind) in enumerate(VIDEO_SUMMARY_SECTIONS, start=1):
+        value = data.get(key)
+        if kind == "scored" and isinstance(value, dict):
+            lines.append(f"{number}. **{heading}** ({value.get('score', '-')}/10): {value.get('comment', '')}")
+        elif kind == "list" and isinstance(value, list):
+            lines.append(f"{number}. **{heading}**")
+            lines.extend(f"   - {item}" for item in value)
+        else:
+            lines.append(f"{number}. **{heading}**: {value or '-'}")
+    lines.append(f"{len(VIDEO_SUMMARY_SECTIONS) + 1}. **Final Overall Score**: {data.get('final_score', '-')}/10")
+    return "\n".join(lines)
+
+
+def _expression_buffer(session: dict) -> deque:
+    """Get the bounded expression history, re-wrapping lists restored from MongoDB"""
+    history = session.get("expression_history")
+    if not isinstance(history, deque):
+        history = deque(history or [], maxlen=EXPRESSION_HISTORY_MAXLEN)
+        session["expression_history"] = history
+    return history
+
+
+def _expression_totals(session: dict) -> dict:
+    """Get running expression totals, backfilling them for older sessions"""
+    totals = session.get("expression_totals")
+    if totals is None:
+        totals = {"count": 0, "confidence": 0.0, "eye_contact": 0.0, "engagement": 0.0, "emotions": {}}
+        for h in session.get("expression_history") or []:
+            totals["count"] += 1
+            totals["confidence"] += h.get("confidence", 0)
+            totals["eye_contact"] += h.get("eyeContact", 0)
+            totals["engagement"] += h.get("engagement", 0)
+            totals["emotions"][h.get("emotion", "neutral")] = totals["emotions"].get(h.get("emotion", "neutral"), 0) + 1
+        session["expression_totals"] = totals
+    return totals
+
+
+async def record_expression_sample(session_id: str, session: dict, sample: dict):
+    """Append an expression sample and update the running video metrics.
+    With Redis the sample and totals are written atomically in their own keys right away,
+    so callers must not rely on save_session for them."""
+    if session_store.is_shared:
+        history, totals = await session_store.append_expression(session_id, session, sample, EXPRESSION_HISTORY_MAXLEN)
+        session["expression_history"] = deque(history, maxlen=EXPRESSION_HISTORY_MAXLEN)
+        session["expression_totals"] = totals
+    else:
+        totals = _expression_totals(session)
+        _expression_buffer(session).append(sample)
+
+        totals["count"] += 1
+        totals["confidence"] += sample["confidence"]
+        totals["eye_contact"] += sample["eyeContact"]
+        totals["engagement"] += sample["engagement"]
+        totals["emotions"][sample["emotion"]] = totals["emotions"].get(sample["emotion"], 0) + 1
+
+    update_video_metrics(session)
+
+
+def update_video_metrics(session: dict):
+    """Recompute the video metrics from the running totals and recent sample window"""
+    totals = _expression_totals(session)
+    history = _expression_buffer(session)
+    count = totals["count"]
+    if not count:
+        return
+    metrics = session["video_metrics"]
+    metrics["avg_confidence"] = round(totals["confidence"] / count, 1)
+    metrics["avg_eye_contact"] = round(totals["eye_contact"] / count, 1)
+    metrics["avg_engagement"] = round(totals["engagement"] / count, 1)
+    metrics["emotion_distribution"] = {
+        k: round(v / count * 100, 1)
+        for k, v in totals["emotions"].items()
+    }
+
+    # Confidence trend compares the two halves of the recent window
+    if len(history) >= 10:
+        recent = list(history)
+        mid = len(recent) // 2
+        first_half_avg = sum(h["confidence"] for h in recent[:mid]) / mid
+        second_half_avg = sum(h["confidence"] for h in recent[mid:]) / (len(recent) - mid)
+        if second_half_avg > first_half_avg + 10:
+            metrics["confidence_trend"] = "improving"
+        elif second_half_avg < first_half_avg - 10:
+            metrics["confidence_trend"] = "declining"
+        else:
+            metrics["confidence_trend"] = "stable"
+
+
 @app.post("/interview/{session_id}/video/expression")
 async def record_expression_data(session_id: str, expression: ExpressionData):
     """Record expression data snapshot from video interview"""
@@ -1249,8 +2096,8 @@ async def record_expression_data(session_id: str, expression: ExpressionData):
     if not expression.timestamp:
         expression.timestamp = int(time.time() * 1000)
     
-    # Add to expression history
-    session["expression_history"].append({
+    # Add to expression history and update running metrics
+    await record_expression_sample(session_id, session, {
         "confidence": expression.confidence,
         "eyeContact": expression.eyeContact,
         "emotion": expression.emotion,
@@ -1258,47 +2105,15 @@ async def record_expression_data(session_id: str, expression: ExpressionData):
         "posture": expression.posture,
         "timestamp": expression.timestamp
     })
-    
-    # Update running metrics
-    history = session["expression_history"]
-    if len(history) > 0:
-        session["video_metrics"]["avg_confidence"] = round(
-            sum(h["confidence"] for h in history) / len(history), 1
-        )
-        session["video_metrics"]["avg_eye_contact"] = round(
-            sum(h["eyeContact"] for h in history) / len(history), 1
-        )
-        session["video_metrics"]["avg_engagement"] = round(
-            sum(h["engagement"] for h in history) / len(history), 1
-        )
-        
-        # Calculate emotion distribution
-        emotion_counts = {}
-        for h in history:
-            emotion_counts[h["emotion"]] = emotion_counts.get(h["emotion"], 0) + 1
-        session["video_metrics"]["emotion_distribution"] = {
-            k: round(v / len(history) * 100, 1) 
-            for k, v in emotion_counts.items()
-        }
-        
-        # Calculate confidence trend
-        if len(history) >= 10:
-            mid = len(history) // 2
-            first_half_avg = sum(h["confidence"] for h in history[:mid]) / mid
-            second_half_avg = sum(h["confidence"] for h in history[mid:]) / (len(history) - mid)
-            if second_half_avg > first_half_avg + 10:
-                session["video_metrics"]["confidence_trend"] = "improving"
-            elif second_half_avg < first_half_avg - 10:
-                session["video_metrics"]["confidence_trend"] = "declining"
-            else:
-                session["video_metrics"]["confidence_trend"] = "stable"
-    
-    # Save updated session
-    await save_session(session_id, session)
-    
+
+    # With Redis the sample is already stored; rewriting the whole session here
+    # could overwrite a turn saved by a concurrent /video/analyze
+    if not session_store.is_shared:
+        await save_session(session_id, session)
+
     return {
         "success": True,
-        "total_samples": len(history),
+        "total_samples": session["expression_totals"]["count"],
         "current_metrics": session["video_metrics"]
     }
 
@@ -1311,19 +2126,19 @@ async def get_video_metrics(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    history = _expression_buffer(session)
+
     return {
         "session_id": session_id,
         "mode": session.get("mode", "audio"),
         "metrics": session["video_metrics"],
-        "total_samples": len(session["expression_history"]),
-        "expression_history": session["expression_history"][-20:]  # Last 20 samples
+        "total_samples": _expression_totals(session)["count"],
+        "expression_history": list(islice(history, max(0, len(history) - 20), None))  # Last 20 samples
     }
 
 
-@app.post("/interview/{session_id}/video/analyze")
-@limiter.limit("30/minute")
+@app.post("/interview/{session_id}/video/analyze", dependencies=[Depends(analyze_rate_limit)])
 async def analyze_video_response(
-    request: Request,
     session_id: str,
     file: UploadFile = File(...),
     confidence: float = Form(0),
@@ -1333,7 +2148,7 @@ async def analyze_video_response(
 ):
     """Process audio with expression data for video interview"""
     
-    session = await get_session(session_id)
+    session, audio = await asyncio.gather(get_session(session_id), read_audio_upload(file))
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
@@ -1345,28 +2160,21 @@ async def analyze_video_response(
         "engagement": engagement,
         "timestamp": int(time.time() * 1000)
     }
-    session["expression_history"].append(expression_snapshot)
+    await record_expression_sample(session_id, session, expression_snapshot)
     
     try:
-        # Save and transcribe audio (same as regular analyze)
-        temp_filename = f"temp_audio_{session_id}.webm"
-        with open(temp_filename, "wb") as buffer:
-            shutil.copyfileobj(file.file, buffer)
-        
-        # Transcribe audio
-        with open(temp_filename, "rb") as audio_file:
-            transcription = client.audio.transcriptions.create(
-                file=audio_file,
+        # Transcribe audio (same as regular analyze)
+        transcription, _ = await asyncio.gather(
+            client.audio.transcriptions.create(
+                file=audio,
                 model="whisper-large-v3-turbo",
                 response_format="text"
-            )
+            ),
+            compress_history(session)
+        )
         
         user_response = transcription.strip()
         
-        # Clean up temp file
-        if os.path.exists(temp_filename):
-            os.remove(temp_filename)
-        
         # Add expression context to the AI prompt for video mode
         expression_context = ""
         if session.get("mode") == "video":
@@ -1405,12 +2213,11 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
 """
         
         # Build conversation for AI
-        messages = [{"role": "system", "content": session["system_prompt"] + expression_context}]
-        messages.extend(session["history"])
+        messages = conversation_messages(session, session["system_prompt"] + expression_context)
         messages.append({"role": "user", "content": user_response})
         
         # Get AI response
-        completion = client.chat.completions.create(
+        completion = await client.chat.completions.create(
             model="llama-3.3-70b-versatile",
             messages=messages,
             temperature=0.7,
@@ -1421,11 +2228,11 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
         
         # Extract score
         score = None
-        score_match = re.search(r'\[SCORE:\s*(\d+(?:\.\d+)?)/10\]', ai_response)
+        score_match = _VIDEO_SCORE_VALUE_RE.search(ai_response)
         if score_match:
             score = float(score_match.group(1))
-            session["scores"].append(score)
-            ai_response_clean = re.sub(r'\s*\[SCORE:\s*\d+(?:\.\d+)?/10\]', '', ai_response)
+            record_score(session, score)
+            ai_response_clean = _VIDEO_SCORE_RE.sub('', ai_response)
             ai_response_clean = ensure_complete_sentences(ai_response_clean)
         else:
             ai_response_clean = ensure_complete_sentences(ai_response)
@@ -1435,14 +2242,12 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
         session["history"].append({"role": "assistant", "content": ai_response_clean})
         
         # Store expression data separately
-        if "expression_snapshots" not in session:
-            session["expression_snapshots"] = []
-        session["expression_snapshots"].append({"expression": expression_snapshot, "score": score})
+        session.setdefault("expression_snapshots", []).append({"expression": expression_snapshot, "score": score})
         session["question_count"] += 1
         
         # Calculate averages
-        scores = session["scores"]
-        avg_score = round(sum(scores) / len(scores), 1) if scores else None
+        avg_score = score_average(session)
+        avg_score = round(avg_score, 1) if avg_score is not None else None
         # Save session state
         await save_session(session_id, session)
         
@@ -1462,24 +2267,89 @@ IMPORTANT: Naturally incorporate body language feedback when appropriate:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+VIDEO_SUMMARY_FALLBACK = "Unable to generate video summary. Please try again."
+
+
+async def persist_video_interview(session_id: str, session: dict, result: dict):
+    """Store a finished video interview and drop its live session"""
+    if session.get("user_id"):
+        await update_interview(session_id, {
+            **_build_interview_doc(
+                session, summary=result["summary"], duration_seconds=result["duration_seconds"]
+            ),
+            "combined_score": result["combined_score"],
+            "video_metrics": result["video_metrics"],
+            "mode": "video"
+        })
+        await invalidate_dashboard(session["user_id"])
+        invalidate_completed_interview(session_id)
+    
+    await remove_session(session_id)
+
+
+async def stream_video_end(
+    session_id: str,
+    session: dict,
+    result: dict,
+    summary_messages: List[dict],
+    include_coaching: bool
+):
+    """SSE stream for /video/end: metadata event, summary tokens, then a done event
+    (summary_data is null here, see end_video_interview)"""
+    coaching_task = asyncio.create_task(generate_coaching(session)) if include_coaching else None
+    
+    try:
+        yield sse_event({"type": "metadata", "data": {k: v for k, v in result.items() if k not in ("summary", "summary_data")}})
+        
+        parts = []
+        try:
+            async for token in stream_completion(summary_messages, temperature=0.5, max_tokens=600):
+                parts.append(token)
+                yield sse_event({"type": "token", "token": token})
+            result["summary"] = "".join(parts)
+        except Exception as e:
+            print(f"Video summary stream error: {e}")
+            result["summary"] = VIDEO_SUMMARY_FALLBACK
+        
+        if coaching_task:
+            result["coaching"] = await coaching_task
+            yield sse_event({"type": "coaching", "coaching": result["coaching"]})
+        
+        yield sse_event({"type": "done", "summary": result["summary"], "summary_data": result["summary_data"]})
+    finally:
+        # A client that leaves early must not leave the coaching call running
+        if coaching_task and not coaching_task.done():
+            coaching_task.cancel()
+
+
 @app.post("/interview/{session_id}/video/end")
-async def end_video_interview(session_id: str):
-    """End video interview and get comprehensive summary with expression analysis"""
+async def end_video_interview(
+    session_id: str,
+    background_tasks: BackgroundTasks,
+    include_coaching: bool = False,
+    stream: bool = False
+):
+    """End video interview and get comprehensive summary with expression analysis.
+    Both paths return the same numbered assessment in "summary". The parsed fields in
+    "summary_data" come from the JSON-mode request, so with stream=true (prose streamed
+    token by token) it is always null."""
     
     session = await get_session(session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    scores = session.get("scores", [])
-    avg_score = round(sum(scores) / len(scores), 1) if scores else None
-    min_score = min(scores) if scores else None
-    max_score = max(scores) if scores else None
+    stats = _score_stats(session)
+    scores = session["scores"]
+    avg_score = round(stats["score_sum"] / stats["score_count"], 1) if stats["score_count"] else None
+    min_score = stats["score_min"]
+    max_score = stats["score_max"]
     
-    start_time = session.get("start_time", time.time())
-    duration_seconds = int(time.time() - start_time)
+    now = time.time()
+    duration_seconds = int(now - session.get("start_time", now))
     
     video_metrics = session.get("video_metrics", {})
-    expression_history = session.get("expression_history", [])
+    emotion_distribution = video_metrics.get("emotion_distribution") or {"neutral": 100}
+    expression_samples = _expression_totals(session)["count"]
     
     # Generate comprehensive video summary using AI
     expression_summary = f"""
@@ -1489,47 +2359,9 @@ Video Interview Expression Analysis:
 - Average Engagement: {video_metrics.get('avg_engagement', 0)}%
 - Confidence Trend: {video_metrics.get('confidence_trend', 'stable')}
 - Emotion Distribution: {video_metrics.get('emotion_distribution', {})}
-- Total Expression Samples: {len(expression_history)}
+- Total Expression Samples: {expression_samples}
 """
     
-    summary_prompt = f"""Based on this VIDEO interview conversation and expression analysis, provide a comprehensive assessment:
-    
-Interview Topic: {session.get('topic_name', session['topic'])}
-Company Style: {session.get('company_name', 'Standard')}
-Difficulty: {session['difficulty']}
-Number of exchanges: {session['question_count']}
-Scores: {scores}
-Average score: {avg_score}/10
-
-{expression_summary}
-
-Conversation:
-{chr(10).join([f"{msg['role'].upper()}: {msg['content']}" for msg in session['history'][:10]])}
-
-Provide a structured VIDEO interview assessment:
-1. **Overall Impression** (considering both content AND body language)
-2. **Technical Performance** - Rate and explain
-3. **Communication & Presence** - Rate based on expression data
-4. **Confidence Analysis** - Based on {video_metrics.get('avg_confidence', 0)}% average confidence
-5. **Eye Contact Assessment** - Based on {video_metrics.get('avg_eye_contact', 0)}% eye contact
-6. **Body Language Strengths**
-7. **Body Language Areas to Improve**
-8. **Specific Recommendations** for video interviews
-9. **Final Overall Score**: X/10
-
-Be constructive and specific about video presence."""
-
-    try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": summary_prompt}],
-            temperature=0.5,
-            max_tokens=600
-        )
-        summary = completion.choices[0].message.content
-    except Exception:
-        summary = "Unable to generate video summary. Please try again."
-    
     # Calculate combined score (50% technical, 30% confidence, 20% eye contact)
     technical_score = avg_score or 5
     confidence_score = (video_metrics.get("avg_confidence", 50) / 100) * 10
@@ -1554,7 +2386,7 @@ Be constructive and specific about video presence."""
             "average": avg_score,
             "min": min_score,
             "max": max_score,
-            "trend": "improving" if len(scores) >= 2 and scores[-1] > scores[0] else "stable"
+            "trend": score_trend(scores)
         },
         "video_metrics": video_metrics,
         "combined_score": combined_score,
@@ -1564,36 +2396,82 @@ Be constructive and specific about video presence."""
             "eye_contact": round(eye_contact_score, 1)
         },
         "expression_summary": {
-            "total_samples": len(expression_history),
+            "total_samples": expression_samples,
             "confidence_trend": video_metrics.get("confidence_trend", "stable"),
-            "dominant_emotion": max(
-                video_metrics.get("emotion_distribution", {"neutral": 100}).items(),
-                key=lambda x: x[1]
-            )[0] if video_metrics.get("emotion_distribution") else "neutral"
+            "dominant_emotion": max(emotion_distribution.items(), key=itemgetter(1))[0]
         },
-        "summary": summary,
+        "summary": None,
         "history": session["history"],
         "duration_seconds": duration_seconds,
         "is_guest": session.get("user_id") is None
     }
     
-    # Update MongoDB if user is authenticated
-    if session.get("user_id"):
-        await update_interview(session_id, {
-            "scores": scores,
-            "average_score": avg_score,
-            "combined_score": combined_score,
-            "video_metrics": video_metrics,
-            "transcript": session["history"],
-            "summary": summary,
-            "question_count": session["question_count"],
-            "ended_at": datetime.utcnow(),
-            "duration_seconds": duration_seconds,
-            "status": "completed",
-            "mode": "video"
-        })
+    summary_prompt = f"""Interview Topic: {session.get('topic_name', session['topic'])}
+Company Style: {session.get('company_name', 'Standard')}
+Difficulty: {session['difficulty']}
+Number of exchanges: {session['question_count']}
+Scores: {scores}
+Average score: {avg_score}/10
+
+{expression_summary}
+
+Conversation:
+{format_transcript(islice(session['history'], 10))}"""
+    summary_messages = [
+        {"role": "system", "content": VIDEO_SUMMARY_RUBRIC},
+        {"role": "user", "content": summary_prompt}
+    ]
     
-    await remove_session(session_id)
+    # Streaming clients get the scores first, then summary tokens as they arrive
+    if stream:
+        result["summary_data"] = None
+        return StreamingResponse(
+            stream_video_end(session_id, session, result, summary_messages, include_coaching),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"},
+            background=BackgroundTask(
+                persist_streamed_end, persist_video_interview, session_id, session, result,
+                summary_messages, 600, VIDEO_SUMMARY_FALLBACK
+            )
+        )
+
+    async def generate_summary() -> tuple:
+        try:
+            raw_summary = await cached_completion(
+                [
+                    {"role": "system", "content": VIDEO_SUMMARY_JSON_RUBRIC},
+                    {"role": "user", "content": summary_prompt}
+                ],
+                temperature=0.5,
+                max_tokens=600,
+                json_mode=True
+            )
+        except Exception:
+            # Includes CompletionTruncated - half a JSON document isn't a summary
+            return VIDEO_SUMMARY_FALLBACK, None
+        try:
+            summary_data = json.loads(raw_summary)
+        except ValueError:
+            # Prose is still a usable summary, a broken JSON document isn't
+            return (VIDEO_SUMMARY_FALLBACK if raw_summary.lstrip().startswith("{") else raw_summary), None
+        if not isinstance(summary_data, dict):
+            return raw_summary, None
+        return render_video_summary(summary_data), summary_data
+    
+    # Optionally generate coaching tips concurrently with the summary
+    coaching = None
+    if include_coaching:
+        (summary, summary_data), coaching = await asyncio.gather(generate_summary(), generate_coaching(session))
+    else:
+        summary, summary_data = await generate_summary()
+    
+    result["summary"] = summary
+    result["summary_data"] = summary_data
+    if coaching is not None:
+        result["coaching"] = coaching
+    
+    # Persist after the response is sent - the client only needs the summary
+    background_tasks.add_task(persist_video_interview, session_id, session, result)
     
     return result
 
@@ -1605,12 +2483,7 @@ async def get_session_status(session_id: str):
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    scores = session.get("scores", [])
-    
-    start_time = session.get("start_time", time.time())
-    elapsed_seconds = int(time.time() - start_time)
-    duration_minutes = session.get("duration_minutes", 30)
-    remaining_seconds = max(0, (duration_minutes * 60) - elapsed_seconds)
+    view = _session_view(session)
     
     return {
         "session_id": session_id,
@@ -1619,12 +2492,12 @@ async def get_session_status(session_id: str):
         "difficulty": session["difficulty"],
         "question_count": session["question_count"],
         "history_length": len(session["history"]),
-        "current_average": round(sum(scores) / len(scores), 1) if scores else None,
+        "current_average": view.average_score,
         "enable_tts": session.get("enable_tts", True),
-        "elapsed_seconds": elapsed_seconds,
-        "remaining_seconds": remaining_seconds,
-        "duration_minutes": duration_minutes,
-        "is_time_up": remaining_seconds <= 0,
+        "elapsed_seconds": view.elapsed_seconds,
+        "remaining_seconds": view.remaining_seconds,
+        "duration_minutes": view.duration_minutes,
+        "is_time_up": view.remaining_seconds <= 0,
         "has_resume": session.get("has_resume", False),
         "has_job_description": session.get("has_job_description", False),
         "is_guest": session.get("user_id") is None
@@ -1649,10 +2522,10 @@ async def get_interview_time(session_id: str):
             "session_exists": False
         }
     
-    start_time = session.get("start_time", time.time())
-    elapsed_seconds = int(time.time() - start_time)
-    duration_minutes = session.get("duration_minutes", 30)
-    remaining_seconds = max(0, (duration_minutes * 60) - elapsed_seconds)
+    view = _session_view(session)
+    elapsed_seconds = view.elapsed_seconds
+    remaining_seconds = view.remaining_seconds
+    duration_minutes = view.duration_minutes
     
     return {
         "elapsed_seconds": elapsed_seconds,
@@ -1672,6 +2545,7 @@ async def get_interview_time(session_id: str):
 @app.post("/user/interviews/save")
 async def save_interview_to_user_history(
     session_id: str,
+    background_tasks: BackgroundTasks,
     current_user: dict = Depends(get_current_user_required)
 ):
     """Save a guest interview to authenticated user's history"""
@@ -1684,6 +2558,7 @@ async def save_interview_to_user_history(
         elif existing.get("user_id") is None:
             # Link orphan interview to user
             await save_interview_to_user(session_id, current_user["_id"])
+            await invalidate_dashboard(current_user["_id"])
             return {"success": True, "message": "Interview linked to your account", "interview_id": existing["_id"]}
         else:
             raise HTTPException(status_code=403, detail="Interview belongs to another user")
@@ -1693,35 +2568,17 @@ async def save_interview_to_user_history(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found or already ended")
     
-    scores = session.get("scores", [])
-    
     # Create interview record
-    interview_data = {
-        "session_id": session_id,
-        "user_id": current_user["_id"],
-        "topic": session.get("topic", "general"),
-        "topic_name": session.get("topic_name", "General Technical"),
-        "company_style": session.get("company_style", "default"),
-        "company_name": session.get("company_name", "Standard"),
-        "difficulty": session.get("difficulty", "medium"),
-        "duration_minutes": session.get("duration_minutes", 30),
-        "question_count": session.get("question_count", 0),
-        "scores": scores,
-        "average_score": round(sum(scores) / len(scores), 1) if scores else None,
-        "transcript": session.get("history", []),
-        "has_resume": bool(session.get("resume_text")),
-        "has_job_description": bool(session.get("job_description")),
-        "started_at": datetime.fromtimestamp(session.get("start_time", time.time())),
-        "ended_at": datetime.utcnow(),
-        "duration_seconds": int(time.time() - session.get("start_time", time.time())),
-        "status": "completed"
-    }
+    interview_data = _build_interview_doc(session, include_metadata=True)
+    interview_data["session_id"] = session_id
+    interview_data["user_id"] = current_user["_id"]
     
     result = await create_interview_db(interview_data)
+    await invalidate_dashboard(current_user["_id"])
     
-    # Update session to mark as saved
+    # Update session to mark as saved (persisted after the response is sent)
     session["user_id"] = current_user["_id"]
-    await save_session(session_id, session)
+    background_tasks.add_task(save_session, session_id, session)
     
     return {"success": True, "message": "Interview saved successfully", "interview_id": result["_id"]}
 
@@ -1733,7 +2590,10 @@ async def get_user_interviews_endpoint(
     offset: int = 0
 ):
     """Get authenticated user's interview history"""
-    interviews = await db_get_user_interviews(current_user["_id"], limit=limit, skip=offset)
+    interviews = await db_get_user_interviews(
+        current_user["_id"], limit=limit, skip=offset, status="completed",
+        projection=LIST_VIEW_PROJECTION
+    )
     
     return {
         "total": len(interviews),
@@ -1748,10 +2608,10 @@ async def get_user_interviews_endpoint(
                 "average_score": i.get("average_score"),
                 "scores": i.get("scores"),
                 "duration_seconds": i.get("duration_seconds"),
-                "started_at": i.get("started_at").isoformat() if i.get("started_at") else None,
-                "ended_at": i.get("ended_at").isoformat() if i.get("ended_at") else None
+                "started_at": i.get("started_at"),
+                "ended_at": i.get("ended_at")
             }
-            for i in interviews if i.get("status") == "completed"
+            for i in interviews
         ]
     }
 
@@ -1762,8 +2622,6 @@ async def get_user_interview_detail(
     current_user: dict = Depends(get_current_user_required)
 ):
     """Get detailed view of a specific interview"""
-    from database import get_interview_by_id
-    
     interview = await get_interview_by_id(interview_id)
     
     if not interview or interview.get("user_id") != current_user["_id"]:
@@ -1785,8 +2643,8 @@ async def get_user_interview_detail(
         "improvements": interview.get("improvements"),
         "has_resume": interview.get("has_resume"),
         "has_job_description": interview.get("has_job_description"),
-        "started_at": interview.get("started_at").isoformat() if interview.get("started_at") else None,
-        "ended_at": interview.get("ended_at").isoformat() if interview.get("ended_at") else None,
+        "started_at": interview.get("started_at"),
+        "ended_at": interview.get("ended_at"),
         "duration_seconds": interview.get("duration_seconds")
     }
 
@@ -1802,6 +2660,8 @@ async def delete_user_interview_endpoint(
     if not deleted:
         raise HTTPException(status_code=404, detail="Interview not found")
     
+    await invalidate_dashboard(current_user["_id"])
+    invalidate_completed_interview(interview_id=interview_id)
     return {"message": "Interview deleted successfully"}
 
 
@@ -1814,7 +2674,7 @@ async def get_user_stats_endpoint(current_user: dict = Depends(get_current_user_
     return {
         "total_interviews": xp_data.get("total_interviews", stats.get("total_interviews", 0)),
         "total_questions": xp_data.get("total_questions", stats.get("total_questions", 0)),
-        "average_score": xp_data.get("average_score", stats.get("average_score", 0)),
+        "average_score": round(xp_average_score(xp_data, stats.get("average_score", 0)), 1),
         "perfect_scores": xp_data.get("perfect_scores", stats.get("perfect_scores", 0)),
         "current_streak": xp_data.get("current_streak", 0),
         "longest_streak": xp_data.get("longest_streak", 0),
@@ -1840,19 +2700,35 @@ async def get_user_xp(current_user: dict = Depends(get_current_user_required)):
     }
 
 
+def xp_average_score(xp_data: dict, default: float = 0) -> float:
+    """Average interview score from the running integer sum kept in xp_data"""
+    if xp_data.get("score_count"):
+        return xp_data["score_sum"] / xp_data["score_count"]
+    return xp_data.get("average_score", default)
+
+
+def _build_level_table(limit: int = 2 ** 63):
+    """Precompute the XP at which each level starts and the XP each level spans"""
+    starts, steps = [0], [100]
+    while starts[-1] + steps[-1] < limit:
+        starts.append(starts[-1] + steps[-1])
+        steps.append(int(steps[-1] * 1.2))
+    return starts, steps
+
+
+# LEVEL_XP_STARTS[i] is the total XP where level i + 1 begins; LEVEL_XP_STEPS[i]
+# is the XP needed to go from level i + 1 to i + 2 (grows 20% per level)
+LEVEL_XP_STARTS, LEVEL_XP_STEPS = _build_level_table()
+
+
 def calculate_level(total_xp: int) -> dict:
     """Calculate level from total XP"""
-    level = 1
-    xp_for_next = 100
-    remaining_xp = total_xp
-    
-    while remaining_xp >= xp_for_next:
-        remaining_xp -= xp_for_next
-        level += 1
-        xp_for_next = int(xp_for_next * 1.2)
+    index = max(bisect_right(LEVEL_XP_STARTS, total_xp) - 1, 0)
+    remaining_xp = total_xp - LEVEL_XP_STARTS[index]
+    xp_for_next = LEVEL_XP_STEPS[index]
     
     return {
-        "level": level,
+        "level": index + 1,
         "current_xp": remaining_xp,
         "xp_to_next_level": xp_for_next,
         "progress": round((remaining_xp / xp_for_next) * 100, 1)
@@ -1874,17 +2750,12 @@ async def add_user_xp(
     question_bonus = question_count * 5
     xp_earned = int((base_xp + question_bonus) * multiplier)
     
-    xp_data = current_user.get("xp_data", {"total_xp": 0})
-    xp_data["total_xp"] = xp_data.get("total_xp", 0) + xp_earned
-    xp_data["total_interviews"] = xp_data.get("total_interviews", 0) + 1
-    xp_data["total_questions"] = xp_data.get("total_questions", 0) + question_count
-    
-    if score >= 9:
-        xp_data["perfect_scores"] = xp_data.get("perfect_scores", 0) + 1
-    
-    # Update streak
-    today = datetime.utcnow().date()
-    last_activity = xp_data.get("last_activity_date")
+    # Streak is derived from the last activity date loaded with the user
+    prior_xp = current_user.get("xp_data") or {}
+    now = datetime.now(timezone.utc)
+    today = now.date()
+    last_activity = prior_xp.get("last_activity_date")
+    streak_fields = {"last_activity_date": now}
     
     if last_activity:
         if isinstance(last_activity, str):
@@ -1892,36 +2763,57 @@ async def add_user_xp(
         elif isinstance(last_activity, datetime):
             last_activity = last_activity.date()
         
-        if (today - last_activity).days == 1:
-            xp_data["current_streak"] = xp_data.get("current_streak", 0) + 1
-        elif (today - last_activity).days > 1:
-            xp_data["current_streak"] = 1
+        days_since = (today - last_activity).days
+        if days_since == 1:
+            streak_fields["current_streak"] = prior_xp.get("current_streak", 0) + 1
+        elif days_since > 1:
+            streak_fields["current_streak"] = 1
     else:
-        xp_data["current_streak"] = 1
+        streak_fields["current_streak"] = 1
     
-    xp_data["longest_streak"] = max(xp_data.get("longest_streak", 0), xp_data.get("current_streak", 0))
-    xp_data["last_activity_date"] = datetime.utcnow()
+    # Counters use $inc so concurrent completions can't overwrite each other
+    xp_data = await increment_user_xp(
+        current_user["_id"],
+        {
+            "total_xp": xp_earned,
+            "total_interviews": 1,
+            "total_questions": question_count,
+            "perfect_scores": 1 if score >= 9 else 0,
+            "score_sum": score,
+            "score_count": 1
+        },
+        set_fields=streak_fields,
+        max_fields={"longest_streak": streak_fields.get("current_streak", prior_xp.get("current_streak", 0))}
+    )
+    if xp_data is None:
+        raise HTTPException(status_code=404, detail="User not found")
     
-    await update_user_xp(current_user["_id"], xp_data)
+    # Check achievements against the updated totals; only the ones actually granted
+    # (a concurrent request may have got there first) count towards the response
+    current_achievements = {a["achievement_id"] for a in current_user.get("achievements", [])}
+    achievements_earned = check_achievements(current_achievements, xp_data, score)
     
-    # Check achievements
-    achievements_earned = await check_achievements(current_user["_id"], xp_data, score)
+    awarded = await award_achievements(current_user["_id"], {a["id"]: a["xp_reward"] for a in achievements_earned})
+    await invalidate_dashboard(current_user["_id"])
     
-    level_info = calculate_level(xp_data["total_xp"])
+    total_xp = xp_data.get("total_xp", 0) + sum(awarded.values())
+    level_info = calculate_level(total_xp)
     
     return {
         "xp_earned": xp_earned,
-        "total_xp": xp_data["total_xp"],
+        "total_xp": total_xp,
         "level": level_info["level"],
         "progress": level_info["progress"],
-        "new_achievements": achievements_earned
+        "new_achievements": [a for a in achievements_earned if a["id"] in awarded]
     }
 
 
-async def check_achievements(user_id: str, xp_data: dict, latest_score: int) -> list:
-    """Check and award achievements"""
-    user = await get_user_by_id(user_id)
-    current_achievements = [a["achievement_id"] for a in user.get("achievements", [])]
+def check_achievements(current_achievements: set, xp_data: dict, latest_score: int) -> list:
+    """Find newly earned achievements (their XP rewards are granted by award_achievements)"""
+    # Veterans who have everything can't earn anything new
+    if len(current_achievements) >= len(ACHIEVEMENTS):
+        return []
+    
     new_achievements = []
     
     # Check each achievement
@@ -1938,17 +2830,11 @@ async def check_achievements(user_id: str, xp_data: dict, latest_score: int) ->
         "interviews_20": xp_data.get("total_interviews", 0) >= 20,
     }
     
+    # Checks are listed in ACHIEVEMENTS order, so results come out in catalog order
     for ach_id, condition in achievement_checks.items():
         if condition and ach_id not in current_achievements:
-            await add_user_achievement(user_id, ach_id)
-            achievement = next((a for a in ACHIEVEMENTS if a["id"] == ach_id), None)
-            if achievement:
-                new_achievements.append(achievement)
-                # Award XP for achievement
-                xp_data["total_xp"] = xp_data.get("total_xp", 0) + achievement["xp_reward"]
-    
-    if new_achievements:
-        await update_user_xp(user_id, xp_data)
+            achievement = ACHIEVEMENTS_BY_ID[ach_id]
+            new_achievements.append(achievement)
     
     return new_achievements
 
@@ -1989,36 +2875,35 @@ async def sync_user_data(
     Sync local guest data with user's server profile.
     Called after login/register to merge progress made as guest.
     """
-    xp_data = current_user.get("xp_data", {"total_xp": 0})
-    xp_before = xp_data.get("total_xp", 0)
-    
-    # Sync XP - take maximum
-    if data.total_xp > 0:
-        xp_data["total_xp"] = max(xp_data.get("total_xp", 0), data.total_xp)
+    xp_before = (current_user.get("xp_data") or {}).get("total_xp", 0)
     
-    # Sync stats
+    # Sync XP and stats - take the maximum, field by field with $max so a
+    # concurrent /user/xp/add's $inc counters aren't overwritten
+    max_fields = {"total_xp": data.total_xp}
     if data.stats:
-        if data.stats.get('totalInterviews', 0) > xp_data.get('total_interviews', 0):
-            xp_data['total_interviews'] = data.stats['totalInterviews']
-        if data.stats.get('perfectScores', 0) > xp_data.get('perfect_scores', 0):
-            xp_data['perfect_scores'] = data.stats['perfectScores']
-        if data.stats.get('streak', 0) > xp_data.get('current_streak', 0):
-            xp_data['current_streak'] = data.stats['streak']
-        if data.stats.get('streak', 0) > xp_data.get('longest_streak', 0):
-            xp_data['longest_streak'] = data.stats['streak']
-    
-    await update_user_xp(current_user["_id"], xp_data)
-    
-    # Sync achievements
-    current_achievements = [a["achievement_id"] for a in current_user.get("achievements", [])]
-    added_achievements = []
-    
-    for ach_id in data.achievements:
-        if ach_id not in current_achievements:
-            ach_def = next((a for a in ACHIEVEMENTS if a["id"] == ach_id), None)
-            if ach_def:
-                await add_user_achievement(current_user["_id"], ach_id)
-                added_achievements.append(ach_id)
+        streak = data.stats.get("streak", 0)
+        max_fields.update({
+            "total_interviews": data.stats.get("totalInterviews", 0),
+            "perfect_scores": data.stats.get("perfectScores", 0),
+            "current_streak": streak,
+            "longest_streak": streak
+        })
+    xp_data = await increment_user_xp(current_user["_id"], {}, max_fields=max_fields)
+    if xp_data is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Sync achievements - known ids the user doesn't have yet, in request order
+    current_achievements = {a["achievement_id"] for a in current_user.get("achievements", [])}
+    new_achievements = [
+        ach_id for ach_id in dict.fromkeys(data.achievements)
+        if ach_id in ACHIEVEMENTS_BY_ID and ach_id not in current_achievements
+    ]
+    
+    # The guest's total_xp already includes achievement rewards, so none are granted here
+    awarded = await award_achievements(current_user["_id"], dict.fromkeys(new_achievements, 0))
+    added_achievements = [ach_id for ach_id in new_achievements if ach_id in awarded]
+    
+    await invalidate_dashboard(current_user["_id"])
     
     return {
         "success": True,
@@ -2030,37 +2915,73 @@ async def sync_user_data(
     }
 
 
+# Dashboard responses are cached briefly per user to absorb page refreshes;
+# anything that changes XP, achievements, profile or history invalidates them.
+DASHBOARD_CACHE_TTL_SECONDS = 30
+dashboard_cache = TTLCache(maxsize=1024, ttl=DASHBOARD_CACHE_TTL_SECONDS)
+
+# With Redis the cached body is shared and invalidated across workers, so it can live longer
+DASHBOARD_REDIS_TTL_SECONDS = 300
+
+
+def dashboard_redis_key(user_id: str) -> str:
+    """Versioned Redis key for a user's cached dashboard"""
+    return f"v1:user:{user_id}:dashboard"
+
+
+async def invalidate_dashboard(user_id: Optional[str]):
+    """Drop a user's cached dashboard"""
+    if not user_id:
+        return
+    if session_store.redis is not None:
+        await session_store.redis.delete(dashboard_redis_key(user_id))
+    else:
+        dashboard_cache.pop(user_id, None)
+
+
 @app.get("/user/dashboard")
 async def get_user_dashboard(current_user: dict = Depends(get_current_user_required)):
     """Get comprehensive dashboard data"""
+    redis_client = session_store.redis
+    if redis_client is not None:
+        cached_body = await redis_client.get(dashboard_redis_key(current_user["_id"]))
+        if cached_body:
+            return Response(cached_body, media_type="application/json")
+    else:
+        cached = dashboard_cache.get(current_user["_id"])
+        if cached is not None:
+            return cached
+    
     xp_data = current_user.get("xp_data", {"total_xp": 0})
     level_info = calculate_level(xp_data.get("total_xp", 0))
     
     user_achievements = current_user.get("achievements", [])
     unlocked_ids = [a["achievement_id"] for a in user_achievements]
     
-    recent_interviews = await db_get_user_interviews(current_user["_id"], limit=10)
+    recent_interviews = await db_get_user_interviews(
+        current_user["_id"], limit=10, status="completed", projection=LIST_VIEW_PROJECTION
+    )
     
     interview_history = [
         {
             "id": i.get("_id"),
-            "date": i.get("started_at").isoformat() if i.get("started_at") else None,
+            "date": i.get("started_at"),
             "topic": i.get("topic_name") or i.get("topic"),
             "difficulty": i.get("difficulty"),
             "score": i.get("average_score"),
             "questions": i.get("question_count")
         }
-        for i in recent_interviews if i.get("status") == "completed"
+        for i in recent_interviews
     ]
     
-    return {
+    dashboard = {
         "user": {
             "id": current_user["_id"],
             "username": current_user.get("username"),
             "email": current_user.get("email"),
             "full_name": current_user.get("full_name"),
             "is_premium": current_user.get("is_premium", False),
-            "member_since": current_user.get("created_at").isoformat() if current_user.get("created_at") else None
+            "member_since": current_user.get("created_at")
         },
         "xp": {
             "total_xp": xp_data.get("total_xp", 0),
@@ -2072,7 +2993,7 @@ async def get_user_dashboard(current_user: dict = Depends(get_current_user_requi
         "stats": {
             "total_interviews": xp_data.get("total_interviews", 0),
             "total_questions": xp_data.get("total_questions", 0),
-            "average_score": round(xp_data.get("average_score", 0), 1),
+            "average_score": round(xp_average_score(xp_data), 1),
             "perfect_scores": xp_data.get("perfect_scores", 0),
             "current_streak": xp_data.get("current_streak", 0),
             "longest_streak": xp_data.get("longest_streak", 0)
@@ -2084,10 +3005,58 @@ async def get_user_dashboard(current_user: dict = Depends(get_current_user_requi
         },
         "recent_interviews": interview_history
     }
+    if redis_client is not None:
+        await redis_client.set(
+            dashboard_redis_key(current_user["_id"]), orjson.dumps(dashboard), ex=DASHBOARD_REDIS_TTL_SECONDS
+        )
+    else:
+        dashboard_cache[current_user["_id"]] = dashboard
+    
+    return dashboard
 
 
 # ============== FEEDBACK & COACHING ENDPOINTS ==============
 
+FEEDBACK_INSTRUCTIONS = """Analyze interview Q&A pairs briefly. For each pair, give 2-3 sentences of feedback and suggest a better answer in 2-3 sentences."""
+
+BATCH_FEEDBACK_FORMAT = """Respond with ONLY a JSON array in this format: [{"index": 1, "feedback": "..."}]"""
+
+
+def parse_batch_feedback(raw: str) -> dict:
+    """Map Q&A index -> feedback from a JSON array reply (empty if unparseable)"""
+    start, end = raw.find("["), raw.rfind("]")
+    if start == -1 or end <= start:
+        return {}
+    try:
+        items = json.loads(raw[start:end + 1])
+    except ValueError:
+        return {}
+    return {
+        item.get("index"): item.get("feedback")
+        for item in items
+        if isinstance(item, dict) and isinstance(item.get("feedback"), str)
+    }
+
+
+async def single_question_feedback(qa: dict) -> str:
+    """Generate feedback for one Q&A pair"""
+    feedback_prompt = f"""QUESTION: {qa['question']}
+ANSWER: {qa['answer']}
+SCORE: {qa['score']}/10"""
+
+    try:
+        return await cached_completion(
+            [
+                {"role": "system", "content": FEEDBACK_INSTRUCTIONS},
+                {"role": "user", "content": feedback_prompt}
+            ],
+            temperature=0.5,
+            max_tokens=200
+        )
+    except:
+        return "Unable to generate feedback."
+
+
 @app.post("/interview/{session_id}/question-feedback")
 async def get_question_feedback(session_id: str):
     """Generate detailed feedback for each question-answer pair"""
@@ -2099,51 +3068,50 @@ async def get_question_feedback(session_id: str):
     history = session["history"]
     scores = session.get("scores", [])
     
-    qa_pairs = []
-    current_question = None
-    score_index = 0
-    
-    for msg in history:
-        if msg["role"] == "assistant":
-            question = re.sub(r'\s*\[SCORE:\s*\d+/10\]', '', msg["content"]).strip()
-            current_question = question
-        elif msg["role"] == "user" and current_question:
-            score = scores[score_index] if score_index < len(scores) else None
-            qa_pairs.append({
-                "index": len(qa_pairs) + 1,
-                "question": current_question,
-                "answer": msg["content"],
-                "score": score
-            })
-            score_index += 1
-            current_question = None
-    
-    detailed_feedback = []
-    
-    for qa in qa_pairs[:5]:  # Limit to first 5 for performance
-        feedback_prompt = f"""Analyze this interview Q&A briefly:
-
-QUESTION: {qa['question']}
-ANSWER: {qa['answer']}
-SCORE: {qa['score']}/10
-
-Give 2-3 sentences of feedback and suggest a better answer in 2-3 sentences."""
-
+    # Turns alternate question/answer, so the i-th answer pairs with the i-th question
+    questions = [m["content"] for m in history if m["role"] == "assistant"]
+    answers = [m["content"] for m in history if m["role"] == "user"]
+    qa_pairs = [
+        {
+            "index": i + 1,
+            "question": _SCORE_RE.sub('', question).strip(),
+            "answer": answer,
+            "score": scores[i] if i < len(scores) else None
+        }
+        for i, (question, answer) in enumerate(zip(questions, answers))
+    ]
+    
+    selected_pairs = qa_pairs[:5]  # Limit to first 5 for performance
+    feedback_by_index = {}
+    
+    if selected_pairs:
+        pairs_text = "\n\n".join(
+            f"[{qa['index']}]\nQUESTION: {qa['question']}\nANSWER: {qa['answer']}\nSCORE: {qa['score']}/10"
+            for qa in selected_pairs
+        )
         try:
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[{"role": "user", "content": feedback_prompt}],
+            raw_feedback = await cached_completion(
+                [
+                    {"role": "system", "content": f"{FEEDBACK_INSTRUCTIONS}\n{BATCH_FEEDBACK_FORMAT}"},
+                    {"role": "user", "content": pairs_text}
+                ],
                 temperature=0.5,
-                max_tokens=200
+                max_tokens=200 * len(selected_pairs)
             )
-            feedback = completion.choices[0].message.content
-        except:
-            feedback = "Unable to generate feedback."
-        
-        detailed_feedback.append({
-            **qa,
-            "feedback": feedback
-        })
+            feedback_by_index = parse_batch_feedback(raw_feedback)
+        except Exception as e:
+            print(f"Batch feedback failed, falling back to per-question calls: {e}")
+    
+    # Fall back to concurrent single-question calls for anything the batch missed
+    missing_pairs = [qa for qa in selected_pairs if not feedback_by_index.get(qa["index"])]
+    if missing_pairs:
+        fallback = await asyncio.gather(*(single_question_feedback(qa) for qa in missing_pairs))
+        feedback_by_index.update(zip((qa["index"] for qa in missing_pairs), fallback))
+    
+    detailed_feedback = [
+        {**qa, "feedback": feedback_by_index[qa["index"]]}
+        for qa in selected_pairs
+    ]
     
     return {
         "session_id": session_id,
@@ -2152,118 +3120,400 @@ Give 2-3 sentences of feedback and suggest a better answer in 2-3 sentences."""
     }
 
 
-@app.get("/interview/{session_id}/coaching")
-async def get_coaching_tips(session_id: str):
-    """Generate personalized coaching based on interview performance"""
-    
-    session = await get_session(session_id)
-    if not session:
-        raise HTTPException(status_code=404, detail="Session not found")
-    
+COACHING_INSTRUCTIONS = """You are an interview coach. Based on the interview performance provided, give 3 specific, actionable coaching tips to improve performance.
+
+Respond with ONLY a JSON object: {"tips": [{"title": "short title", "detail": "one or two sentences"}]}"""
+
+
+def render_coaching_tip(number: int, tip) -> str:
+    """Render one coaching tip as a numbered Markdown list item"""
+    if isinstance(tip, dict):
+        return f"{number}. **{tip.get('title', 'Tip')}**: {tip.get('detail', '')}"
+    return f"{number}. {tip}"
+
+
+def render_coaching_tips(data: dict) -> str:
+    """Render structured coaching tips as a numbered Markdown list"""
+    tips = data.get("tips") if isinstance(data, dict) else None
+    if not isinstance(tips, list) or not tips:
+        raise ValueError("No coaching tips in response")
+    return "\n".join(render_coaching_tip(number, tip) for number, tip in enumerate(tips, start=1))
+
+
+COACHING_FALLBACK = "Keep practicing and focus on clear, structured answers."
+
+
+def coaching_messages(session: dict) -> List[dict]:
+    """Build the coaching prompt for a session"""
     history = session["history"]
-    scores = session.get("scores", [])
-    
-    avg_score = sum(scores) / len(scores) if scores else 0
+    avg_score = score_average(session) or 0
+    recent_responses = "\n".join(
+        f"- {msg['content'][:100]}..." for msg in history[-6:] if msg['role'] == 'user'
+    )
     
-    coaching_prompt = f"""Based on this {session.get('topic_name', 'technical')} interview:
-
+    coaching_prompt = f"""Interview topic: {session.get('topic_name', 'technical')}
 Average score: {avg_score:.1f}/10
 Total questions: {session['question_count']}
 Difficulty: {session['difficulty']}
 
 Recent responses:
-{chr(10).join([f"- {msg['content'][:100]}..." for msg in history[-6:] if msg['role'] == 'user'])}
+{recent_responses}"""
+
+    return [
+        {"role": "system", "content": COACHING_INSTRUCTIONS},
+        {"role": "user", "content": coaching_prompt}
+    ]
 
-Provide 3 specific, actionable coaching tips to improve performance."""
 
+def parse_coaching(raw_coaching: str) -> str:
+    """Render the model's JSON tips. A cut-off JSON reply keeps the tips that were
+    complete; prose is passed through as is."""
     try:
-        completion = client.chat.completions.create(
-            model="llama-3.3-70b-versatile",
-            messages=[{"role": "user", "content": coaching_prompt}],
+        return render_coaching_tips(json.loads(raw_coaching))
+    except ValueError:
+        pass
+    if raw_coaching.lstrip().startswith("{"):
+        tips, _ = completed_tips(raw_coaching, 0)
+        return render_coaching_tips({"tips": tips}) if tips else COACHING_FALLBACK
+    return raw_coaching.strip() or COACHING_FALLBACK
+
+
+_JSON_DECODER = json.JSONDecoder()
+_TIPS_ARRAY_RE = re.compile(r'"tips"\s*:\s*\[')
+
+
+def completed_tips(buffer: str, pos: int) -> Tuple[list, int]:
+    """Decode tip objects that are complete in a partial JSON reply, starting at pos.
+    Returns the tips and the position to resume from once more text arrives."""
+    if pos == 0:
+        match = _TIPS_ARRAY_RE.search(buffer)
+        if not match:
+            return [], 0
+        pos = match.end()
+    
+    tips = []
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos >= len(buffer) or buffer[pos] == "]":
+            return tips, pos
+        try:
+            tip, end = _JSON_DECODER.raw_decode(buffer, pos)
+        except ValueError:
+            return tips, pos
+        tips.append(tip)
+        pos = end
+
+
+async def generate_coaching(session: dict) -> str:
+    """Generate personalized coaching tips for a session"""
+    try:
+        raw_coaching = await cached_completion(
+            coaching_messages(session),
             temperature=0.5,
-            max_tokens=300
+            max_tokens=300,
+            json_mode=True
         )
-        coaching = completion.choices[0].message.content
+    except CompletionTruncated as e:
+        return parse_coaching(e.partial)
     except:
-        coaching = "Keep practicing and focus on clear, structured answers."
+        return COACHING_FALLBACK
+    
+    return parse_coaching(raw_coaching)
+
+
+async def stream_coaching(session_id: str, session: dict):
+    """SSE stream for /coaching: metadata event, one event per tip as it completes, then the rendered tips"""
+    yield sse_event({"type": "metadata", "data": {
+        "session_id": session_id,
+        "average_score": round(score_average(session) or 0, 1),
+        "questions_analyzed": session["question_count"]
+    }})
+    
+    buffer = ""
+    pos = 0
+    tip_count = 0
+    try:
+        async for token in stream_completion(coaching_messages(session), temperature=0.5, max_tokens=300, json_mode=True):
+            buffer += token
+            tips, pos = completed_tips(buffer, pos)
+            for tip in tips:
+                tip_count += 1
+                yield sse_event({"type": "tip", "tip": render_coaching_tip(tip_count, tip)})
+        # The assembled reply is validated as a whole, exactly like the non-stream path
+        coaching = parse_coaching(buffer)
+    except CompletionTruncated:
+        # Cut off at max_tokens: keep exactly the tips already sent as events
+        coaching = parse_coaching(buffer)
+    except Exception as e:
+        print(f"Coaching stream error: {e}")
+        coaching = COACHING_FALLBACK
+    
+    yield sse_event({"type": "done", "coaching": coaching})
+
+
+@app.get("/interview/{session_id}/coaching")
+async def get_coaching_tips(session_id: str, stream: bool = False):
+    """Generate personalized coaching based on interview performance.
+    With stream=true the tips stream in as Server-Sent Events, rendered in the final event."""
+    
+    session = await get_session(session_id)
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    if stream:
+        return StreamingResponse(
+            stream_coaching(session_id, session),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache"}
+        )
+    
+    coaching = await generate_coaching(session)
     
     return {
         "session_id": session_id,
         "coaching": coaching,
-        "average_score": round(avg_score, 1),
+        "average_score": round(score_average(session) or 0, 1),
         "questions_analyzed": session["question_count"]
     }
 
 
 # ============== GLOBAL STATS ==============
 
-@app.get("/stats/global")
-async def get_global_stats():
-    """Get platform-wide statistics (public)"""
-    db = get_database()
-    
-    total_interviews = await db.interviews.count_documents({"status": "completed"})
-    total_users = await db.users.count_documents({})
-    
-    pipeline = [
-        {"$match": {"status": "completed", "average_score": {"$exists": True, "$ne": None}}},
-        {"$group": {"_id": None, "avg_score": {"$avg": "$average_score"}}}
-    ]
-    
-    cursor = db.interviews.aggregate(pipeline)
-    results = await cursor.to_list(length=1)
-    platform_avg = round(results[0]["avg_score"], 1) if results else None
+# Public landing-page stats don't need per-request freshness
+GLOBAL_STATS_CACHE_TTL_SECONDS = 60
+global_stats_cache = TTLCache(maxsize=1, ttl=GLOBAL_STATS_CACHE_TTL_SECONDS)
+
+# Shared copy for multi-worker deployments. Bump the version prefix when the
+# response shape changes. The entry outlives its freshness so that, while one
+# worker holds the refresh lock, the others keep serving the stale copy.
+GLOBAL_STATS_REDIS_KEY = "v1:stats:global"
+GLOBAL_STATS_REDIS_LOCK_KEY = GLOBAL_STATS_REDIS_KEY + ":lock"
+GLOBAL_STATS_REDIS_STALE_SECONDS = 600
+GLOBAL_STATS_REFRESH_LOCK_SECONDS = 5
+
+
+async def compute_global_stats() -> dict:
+    """Run the platform aggregate and build the /stats/global response"""
+    stats = await get_platform_stats()
+    platform_avg = round(stats["avg_score"], 1) if stats["avg_score"] is not None else None
     
     return {
-        "total_interviews_completed": total_interviews,
-        "total_users": total_users,
+        "total_interviews_completed": stats["total_interviews"],
+        "total_users": stats["total_users"],
         "platform_average_score": platform_avg,
         "topics_available": len(INTERVIEW_TOPICS),
         "companies_available": len(COMPANY_STYLES)
     }
 
 
+async def shared_global_stats(redis_client) -> dict:
+    """Cache-aside read of the global stats through Redis, refreshed by one worker at a time"""
+    raw = await redis_client.get(GLOBAL_STATS_REDIS_KEY)
+    entry = orjson.loads(raw) if raw else None
+    if entry is not None and entry["fresh_until"] > time.time():
+        return entry["stats"]
+    
+    # Stale or missing: only the lock holder recomputes, everyone else serves stale
+    got_lock = await redis_client.set(GLOBAL_STATS_REDIS_LOCK_KEY, "1", nx=True, ex=GLOBAL_STATS_REFRESH_LOCK_SECONDS)
+    if not got_lock and entry is not None:
+        return entry["stats"]
+    
+    global_stats = await compute_global_stats()
+    await redis_client.set(
+        GLOBAL_STATS_REDIS_KEY,
+        orjson.dumps({"stats": global_stats, "fresh_until": time.time() + GLOBAL_STATS_CACHE_TTL_SECONDS}),
+        ex=GLOBAL_STATS_REDIS_STALE_SECONDS
+    )
+    if got_lock:
+        await redis_client.delete(GLOBAL_STATS_REDIS_LOCK_KEY)
+    return global_stats
+
+
+@app.get("/stats/global")
+async def get_global_stats():
+    """Get platform-wide statistics (public)"""
+    cached = global_stats_cache.get("global")
+    if cached is not None:
+        return cached
+    
+    if session_store.redis is not None:
+        global_stats = await shared_global_stats(session_store.redis)
+    else:
+        global_stats = await compute_global_stats()
+    global_stats_cache["global"] = global_stats
+    
+    return global_stats
+
+
 # ============== EXPORT ENDPOINT ==============
 
+# Completed interviews don't change, so repeat exports are served from memory.
+# Only used by single-worker deployments: with a shared session store other
+# workers would never see the invalidation when an interview is deleted.
+COMPLETED_INTERVIEW_CACHE_TTL_SECONDS = 600
+completed_interview_cache = TTLCache(maxsize=1024, ttl=COMPLETED_INTERVIEW_CACHE_TTL_SECONDS)
+
+# Only the fields the export report reads are loaded from MongoDB
+EXPORT_PROJECTION = {
+    "status": 1, "topic": 1, "topic_name": 1, "company_style": 1, "company_name": 1,
+    "difficulty": 1, "average_score": 1, "summary": 1, "started_at": 1
+}
+
+
+async def get_completed_interview(session_id: str) -> Optional[dict]:
+    """Fetch an interview by session ID, caching it once it is completed (single worker only)"""
+    if session_store.is_shared:
+        return await get_interview_by_session_id(session_id, EXPORT_PROJECTION)
+    
+    interview = completed_interview_cache.get(session_id)
+    if interview is None:
+        interview = await get_interview_by_session_id(session_id, EXPORT_PROJECTION)
+        if interview and interview.get("status") == "completed":
+            completed_interview_cache[session_id] = interview
+    return interview
+
+
+def invalidate_completed_interview(session_id: Optional[str] = None, interview_id: Optional[str] = None):
+    """Drop a cached completed interview by session ID or document ID"""
+    if session_id:
+        completed_interview_cache.pop(session_id, None)
+    if interview_id:
+        for key, interview in list(completed_interview_cache.items()):
+            if interview.get("_id") == interview_id:
+                completed_interview_cache.pop(key, None)
+
+
+class ReportOut(BaseModel):
+    """Export report fields; unset fields are omitted from the JSON"""
+    topic: Optional[str] = None
+    company_style: Optional[str] = None
+    difficulty: Optional[str] = None
+    total_questions: Optional[int] = None
+    average_score: Optional[float] = None
+    scores: Optional[List[Union[int, float]]] = None
+    summary: Optional[str] = None
+    date: Optional[datetime] = None
+
+
+class ExportOut(BaseModel):
+    session_id: str
+    report: ReportOut
+
+
+def export_json(session_id: str, report: ReportOut) -> bytes:
+    """Encode an export with pydantic-core, leaving out fields the report didn't set"""
+    return ExportOut(session_id=session_id, report=report).model_dump_json(exclude_unset=True).encode()
+
+
+def export_etag(session_id: str, *version) -> str:
+    """Weak ETag for an export (weak because gzip may re-encode the body)"""
+    key = ":".join(str(part) for part in (session_id, *version))
+    return f'W/"{hashlib.blake2b(key.encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """True if the client already holds this version of the export"""
+    if_none_match = request.headers.get("if-none-match", "")
+    return if_none_match == "*" or etag in if_none_match
+
+
+# Transcript turns encoded per chunk when streaming a live session export
+EXPORT_STREAM_BATCH_TURNS = 50
+
+# Encoded live exports, reused until the session gets a new turn or score
+EXPORT_BYTES_CACHE_TTL_SECONDS = 600
+export_bytes_cache = TTLCache(maxsize=256, ttl=EXPORT_BYTES_CACHE_TTL_SECONDS)
+
+
+def export_version(session: dict) -> tuple:
+    """Identify the session state a cached export was encoded from"""
+    return (len(session["history"]), _score_stats(session)["score_count"])
+
+
+async def iter_export_json(session_id: str, report: ReportOut, transcript: list, version: Optional[tuple] = None):
+    """Yield the export JSON in pieces, with the transcript encoded a batch of turns at a time.
+    With a version, the full body is kept in export_bytes_cache once streaming finishes."""
+    chunks = [export_json(session_id, report)[:-2] + b',"transcript":[']
+    yield chunks[0]
+    for start in range(0, len(transcript), EXPORT_STREAM_BATCH_TURNS):
+        batch = orjson.dumps(transcript[start:start + EXPORT_STREAM_BATCH_TURNS])[1:-1]
+        chunks.append((b"," + batch) if start else batch)
+        yield chunks[-1]
+    chunks.append(b"]}}")
+    yield chunks[-1]
+    
+    if version is not None:
+        export_bytes_cache[session_id] = (version, b"".join(chunks))
+
+
 @app.post("/interview/{session_id}/export")
-async def export_interview_report(session_id: str):
-    """Generate exportable interview report"""
+async def export_interview_report(request: Request, session_id: str, summary: bool = False):
+    """Generate exportable interview report (summary=true omits scores and transcript).
+    Responses carry an ETag; a matching If-None-Match gets 304 with no body."""
     
     session = await get_session(session_id)
     if not session:
+        export_bytes_cache.pop(session_id, None)
+        
         # Check database for completed interview
-        interview = await get_interview_by_session_id(session_id)
+        interview = await get_completed_interview(session_id)
         if not interview:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        return {
-            "session_id": session_id,
-            "report": {
-                "topic": interview.get("topic_name") or interview.get("topic"),
-                "company_style": interview.get("company_name") or interview.get("company_style"),
-                "difficulty": interview.get("difficulty"),
-                "average_score": interview.get("average_score"),
-                "summary": interview.get("summary"),
-                "date": interview.get("started_at").isoformat() if interview.get("started_at") else None
-            }
-        }
+        etag = export_etag(session_id, "completed", interview.get("_id"))
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        report = ReportOut(
+            topic=interview.get("topic_name") or interview.get("topic"),
+            company_style=interview.get("company_name") or interview.get("company_style"),
+            difficulty=interview.get("difficulty"),
+            average_score=interview.get("average_score"),
+            summary=interview.get("summary"),
+            date=interview.get("started_at")
+        )
+        return Response(export_json(session_id, report), media_type="application/json", headers={"ETag": etag})
+    
+    version = export_version(session)
+    etag = export_etag(session_id, *version, "summary" if summary else "full")
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    if not summary:
+        cached = export_bytes_cache.get(session_id)
+        if cached is not None and cached[0] == version:
+            return Response(cached[1], media_type="application/json", headers={"ETag": etag})
+    
+    report = ReportOut(
+        topic=session.get("topic_name", session["topic"]),
+        company_style=session.get("company_name", "Standard"),
+        difficulty=session["difficulty"],
+        total_questions=session["question_count"],
+        average_score=_session_view(session).average_score
+    )
+    if summary:
+        return Response(export_json(session_id, report), media_type="application/json", headers={"ETag": etag})
     
-    scores = session.get("scores", [])
+    report.scores = session.get("scores", [])
     
-    return {
-        "session_id": session_id,
-        "report": {
-            "topic": session.get("topic_name", session["topic"]),
-            "company_style": session.get("company_name", "Standard"),
-            "difficulty": session["difficulty"],
-            "total_questions": session["question_count"],
-            "average_score": round(sum(scores) / len(scores), 1) if scores else None,
-            "scores": scores,
-            "transcript": session["history"]
-        }
-    }
+    # Stream the transcript instead of encoding the whole report in one buffer
+    return StreamingResponse(
+        iter_export_json(session_id, report, session["history"], version),
+        media_type="application/json",
+        headers={"ETag": etag}
+    )
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Live sessions only span workers when they are stored in Redis
+    uvicorn.run(
+        "main:app",
+        host=os.getenv("HOST", "0.0.0.0"),
+        port=int(os.getenv("PORT", "8000")),
+        loop="auto" if os.name == "nt" else "uvloop",
+        http="httptools",
+        workers=int(os.getenv("WORKERS", "4" if session_store.is_shared else "1")),
+        limit_concurrency=LIMIT_CONCURRENCY
+    )
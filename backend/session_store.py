@@ -0,0 +1,158 @@
+"""
+Active interview session store for AI Interviewer
+Redis-backed when REDIS_URL is set (shared across workers, keys expire on their own),
+otherwise a bounded in-process TTL cache for single-worker deployments
+"""
+
+import os
+from collections import deque
+from typing import Optional, Tuple
+
+import orjson
+import redis.asyncio as redis
+from cachetools import TTLCache
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+REDIS_URL = os.getenv("REDIS_URL")
+SESSION_KEY_PREFIX = "sess:"
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+
+# Redis keys outlive the planned interview duration by this much
+SESSION_TTL_GRACE_SECONDS = 300
+
+# With Redis, video expression samples and their running totals live in their own
+# list/hash next to the session blob and are updated atomically, so a frequent
+# sample write can't overwrite a turn saved concurrently (or vice versa)
+EXPRESSION_HISTORY_SUFFIX = ":expr"
+EXPRESSION_TOTALS_SUFFIX = ":expr_totals"
+EXPRESSION_FIELDS = ("expression_history", "expression_totals")
+EMOTION_FIELD_PREFIX = "emotion:"
+
+# In-process fallback, matching the 2 hour expiry of the active_sessions collection
+LOCAL_SESSION_TTL_SECONDS = 7200
+LOCAL_SESSION_MAX_ENTRIES = 10000
+
+
+def _encode_default(value):
+    """orjson fallback for session values orjson can't encode natively (expression deque)"""
+    if isinstance(value, deque):
+        return list(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def _session_ttl(session: dict) -> int:
+    """Redis expiry for a session's keys"""
+    return int(session.get("duration_minutes") or 30) * 60 + SESSION_TTL_GRACE_SECONDS
+
+
+def _decode_expression_totals(raw: dict) -> dict:
+    """Rebuild the running expression totals from their Redis hash"""
+    totals = {"count": 0, "confidence": 0.0, "eye_contact": 0.0, "engagement": 0.0, "emotions": {}}
+    for field, value in raw.items():
+        field = field.decode()
+        if field.startswith(EMOTION_FIELD_PREFIX):
+            totals["emotions"][field[len(EMOTION_FIELD_PREFIX):]] = int(value)
+        elif field == "count":
+            totals["count"] = int(value)
+        else:
+            totals[field] = float(value)
+    return totals
+
+
+class SessionStore:
+    """Key-value store for live interview sessions"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.redis = redis.from_url(redis_url, max_connections=REDIS_MAX_CONNECTIONS) if redis_url else None
+        self._local = TTLCache(maxsize=LOCAL_SESSION_MAX_ENTRIES, ttl=LOCAL_SESSION_TTL_SECONDS)
+
+    @property
+    def is_shared(self) -> bool:
+        """True when sessions are visible to every worker process"""
+        return self.redis is not None
+
+    async def get(self, session_id: str) -> Optional[dict]:
+        """Get a session, or None if it is unknown or expired"""
+        if self.redis is None:
+            return self._local.get(session_id)
+
+        key = SESSION_KEY_PREFIX + session_id
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.lrange(key + EXPRESSION_HISTORY_SUFFIX, 0, -1)
+            pipe.hgetall(key + EXPRESSION_TOTALS_SUFFIX)
+            raw, samples, totals = await pipe.execute()
+        if not raw:
+            return None
+
+        session = orjson.loads(raw)
+        if totals:
+            session["expression_history"] = [orjson.loads(sample) for sample in samples]
+            session["expression_totals"] = _decode_expression_totals(totals)
+        return session
+
+    async def set(self, session_id: str, session: dict):
+        """Store a session, refreshing its expiry"""
+        if self.redis is None:
+            self._local[session_id] = session
+            return
+
+        # Expression samples are only written through append_expression
+        key = SESSION_KEY_PREFIX + session_id
+        ttl = _session_ttl(session)
+        document = {k: v for k, v in session.items() if k not in EXPRESSION_FIELDS}
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.set(key, orjson.dumps(document, default=_encode_default, option=orjson.OPT_NON_STR_KEYS), ex=ttl)
+            pipe.expire(key + EXPRESSION_HISTORY_SUFFIX, ttl)
+            pipe.expire(key + EXPRESSION_TOTALS_SUFFIX, ttl)
+            await pipe.execute()
+
+    async def append_expression(self, session_id: str, session: dict, sample: dict, maxlen: int) -> Tuple[list, dict]:
+        """Atomically add an expression sample to a Redis-backed session (bounded to maxlen)
+        and return the current sample window and running totals"""
+        key = SESSION_KEY_PREFIX + session_id
+        history_key = key + EXPRESSION_HISTORY_SUFFIX
+        totals_key = key + EXPRESSION_TOTALS_SUFFIX
+        ttl = _session_ttl(session)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.rpush(history_key, orjson.dumps(sample))
+            pipe.ltrim(history_key, -maxlen, -1)
+            pipe.hincrby(totals_key, "count", 1)
+            pipe.hincrbyfloat(totals_key, "confidence", sample["confidence"])
+            pipe.hincrbyfloat(totals_key, "eye_contact", sample["eyeContact"])
+            pipe.hincrbyfloat(totals_key, "engagement", sample["engagement"])
+            pipe.hincrby(totals_key, EMOTION_FIELD_PREFIX + sample["emotion"], 1)
+            pipe.expire(history_key, ttl)
+            pipe.expire(totals_key, ttl)
+            pipe.lrange(history_key, 0, -1)
+            pipe.hgetall(totals_key)
+            *_, samples, totals = await pipe.execute()
+        return [orjson.loads(s) for s in samples], _decode_expression_totals(totals)
+
+    async def delete(self, session_id: str):
+        """Remove a session"""
+        if self.redis is None:
+            self._local.pop(session_id, None)
+            return
+
+        key = SESSION_KEY_PREFIX + session_id
+        await self.redis.delete(key, key + EXPRESSION_HISTORY_SUFFIX, key + EXPRESSION_TOTALS_SUFFIX)
+
+    async def connect(self):
+        """Open the first Redis connection at startup so requests don't pay for it"""
+        if self.redis is not None:
+            await self.redis.ping()
+            print("✅ Connected to Redis session store")
+
+    async def close(self):
+        """Close the Redis connection pool, if any"""
+        if self.redis is not None:
+            await self.redis.aclose()
+            print("🔌 Redis connection closed")
+
+
+# Shared store instance
+session_store = SessionStore(REDIS_URL)
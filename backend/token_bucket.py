@@ -0,0 +1,66 @@
+"""
+Token bucket rate limiting for AI Interviewer
+Absorbs short bursts (several quick answers in a row) while bounding the sustained rate.
+Buckets live in Redis when a client is given (one atomic script per request),
+otherwise in a bounded in-process cache for single-worker deployments
+"""
+
+import time
+from typing import Optional
+
+import redis.asyncio as redis
+from cachetools import TTLCache
+
+TOKEN_BUCKET_KEY_PREFIX = "bucket:"
+LOCAL_BUCKET_MAX_ENTRIES = 10000
+
+# Refill, take one token if available and store the bucket, atomically.
+# Returns {allowed, tokens}; tokens is a string because Redis truncates Lua numbers.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1]) or capacity
+local ts = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+
+class TokenBucket:
+    """Per-key token bucket: `capacity` requests at once, refilled at `refill_per_minute`"""
+
+    def __init__(self, capacity: int, refill_per_minute: float, redis_client: Optional[redis.Redis] = None):
+        self.capacity = capacity
+        self.rate = refill_per_minute / 60
+        self.redis = redis_client
+        self._script = redis_client.register_script(_TAKE_SCRIPT) if redis_client is not None else None
+        # An idle bucket is full again after capacity / rate seconds, so it can be forgotten
+        self._local = TTLCache(maxsize=LOCAL_BUCKET_MAX_ENTRIES, ttl=capacity / self.rate + 1)
+
+    async def take(self, key: str) -> float:
+        """Take a token for key. Returns 0 if allowed, else seconds until one is available."""
+        if self._script is not None:
+            allowed, tokens = await self._script(
+                keys=[TOKEN_BUCKET_KEY_PREFIX + key],
+                args=[self.capacity, self.rate, time.time()]
+            )
+            tokens = float(tokens)
+        else:
+            now = time.monotonic()
+            tokens, last = self._local.get(key, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - last) * self.rate)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._local[key] = (tokens, now)
+
+        return 0 if allowed else (1 - tokens) / self.rate
@@ -1,17 +1,33 @@
 from PIL import Image
+import argparse
 import os
+from concurrent.futures import ThreadPoolExecutor
 
 # Paths
 source_image_path = r"C:\Users\Saurabh\.gemini\antigravity\brain\68a402af-091b-4ac1-a791-1656335c2e40\media__1770709980916.png"
 output_dir = r"c:/Users/Saurabh/ai-interviewer/frontend/public/assets"
 
-def process_images():
+def is_up_to_date(outputs):
+    """True if every output exists and is newer than the source image"""
+    source_mtime = os.stat(source_image_path).st_mtime
+    return all(os.path.exists(path) and os.stat(path).st_mtime >= source_mtime for path in outputs)
+
+def process_images(force=False):
     if not os.path.exists(source_image_path):
         print(f"Error: Source image not found at {source_image_path}")
         return
 
+    male_output = os.path.join(output_dir, "interviewer_male.png")
+    female_output = os.path.join(output_dir, "interviewer_female.png")
+
+    if not force and is_up_to_date((male_output, female_output)):
+        print(f"Images in {output_dir} are up to date (use --force to regenerate)")
+        return
+
     try:
         img = Image.open(source_image_path)
+        # Decode once up front; both crops then share the same pixel buffer
+        img.load()
         width, height = img.size
         
         # Assuming the image contains two portraits side-by-side or top-bottom.
@@ -25,12 +41,12 @@ def process_images():
         male_img = img.crop((0, 0, width // 2, height))
         female_img = img.crop((width // 2, 0, width, height))
         
-        # Save images
-        male_output = os.path.join(output_dir, "interviewer_male.png")
-        female_output = os.path.join(output_dir, "interviewer_female.png")
-        
-        male_img.save(male_output)
-        female_img.save(female_output)
+        # Save images; PNG encoding releases the GIL, so both halves can compress at once
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            list(executor.map(
+                lambda job: job[0].save(job[1]),
+                [(male_img, male_output), (female_img, female_output)]
+            ))
         
         print(f"Successfully saved images to {output_dir}")
         print(f"Male: {male_output}")
@@ -40,4 +56,6 @@ def process_images():
         print(f"An error occurred: {e}")
 
 if __name__ == "__main__":
-    process_images()
+    parser = argparse.ArgumentParser(description="Split the interviewer source image into male/female assets")
+    parser.add_argument("--force", action="store_true", help="regenerate even if the outputs are newer than the source")
+    process_images(force=parser.parse_args().force)
@@ -5,6 +5,9 @@ import './FillerCounter.css';
 
 const FILLER_WORDS = ['um', 'uh', 'like', 'you know', 'basically', 'actually', 'literally', 'so', 'well', 'right'];
 
+// All fillers in one pattern, so each transcript update is a single scan
+const FILLER_REGEX = new RegExp(`\\b(?:${FILLER_WORDS.join('|')})\\b`, 'g');
+
 const FillerCounter = ({ 
     transcript = '',
     isActive = true,
@@ -24,13 +27,16 @@ const FillerCounter = ({
         const counts = {};
         let total = 0;
         
+        const matched = {};
+        for (const [filler] of lowerTranscript.matchAll(FILLER_REGEX)) {
+            matched[filler] = (matched[filler] || 0) + 1;
+        }
+        
+        // Keep FILLER_WORDS order so ties in the breakdown stay stable
         FILLER_WORDS.forEach(filler => {
-            const regex = new RegExp(`\\b${filler}\\b`, 'gi');
-            const matches = lowerTranscript.match(regex);
-            const count = matches ? matches.length : 0;
-            if (count > 0) {
-                counts[filler] = count;
-                total += count;
+            if (matched[filler]) {
+                counts[filler] = matched[filler];
+                total += matched[filler];
             }
         });
         